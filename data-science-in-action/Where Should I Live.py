@@ -1,6 +1,7 @@
 import streamlit as st
 import base64
 from components.background import add_bg
+from components.debug_panel import profile_page, debug_panel
 from pages import *
 from PIL import Image
 
@@ -29,6 +30,8 @@ def render_sidebar():
 
 
 def main():
+    profile_page("Home")
+
     # --- Header ---
     render_header()
 
@@ -37,6 +40,8 @@ def main():
 
     # --- Background ---
     add_bg("data-science-in-action/images/lisbon-wallpaper.jpg")
+
+    debug_panel()
     
 
 if __name__ == "__main__":
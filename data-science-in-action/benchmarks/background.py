@@ -0,0 +1,70 @@
+"""Bytes on the wire and render time of the landing-page background.
+
+Compares the previous behaviour (the JPEG base64-inlined on every rerun)
+with the memoized inline WebP and the static, cache-headered variants:
+
+    PYTHONPATH=data-science-in-action python -m benchmarks.background
+"""
+import argparse
+import base64
+import os
+import tempfile
+import time
+
+import streamlit as st
+
+from components import background
+
+IMAGE = "data-science-in-action/images/lisbon-wallpaper.jpg"
+
+
+def inline_jpeg_css(image_file):
+    # What add_bg did before: read and encode the original on every rerun
+    with open(image_file, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    return f"<style>.stApp {{ background-image: url('data:image/jpeg;base64,{encoded}'); }}</style>"
+
+
+def per_rerun(css, repeat):
+    # Median seconds to produce the snippet and emit it
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        st.markdown(css(), unsafe_allow_html=True)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes and render time of the background image")
+    parser.add_argument("--image", default=IMAGE)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        variants = background.build_variants(args.image, out_dir=tmp)
+        build = time.perf_counter() - start
+        sizes = {w: os.path.getsize(os.path.join(tmp, name)) for w, name in variants.items()}
+
+    background.background_css.cache_clear()
+    start = time.perf_counter()
+    inline = background.background_css(args.image)
+    inline_build = time.perf_counter() - start
+    static = background.static_css(variants)
+
+    modes = [
+        ("inline JPEG (before)", lambda: inline_jpeg_css(args.image), 0, 0.0),
+        ("inline WebP", lambda: background.background_css(args.image), 0, inline_build),
+        # One variant is fetched once per browser, then served from its cache
+        ("static WebP", lambda: static, min(sizes.values()), build),
+    ]
+    print(f"{'mode':>21} {'bytes/rerun':>12} {'first visit':>12} {'build (ms)':>11} {'rerun (ms)':>11}")
+    for name, css, asset, built in modes:
+        size = len(css().encode())
+        print(f"{name:>21} {size:>12,} {size + asset:>12,} {built * 1e3:>11.1f} {per_rerun(css, args.repeat) * 1e3:>11.3f}")
+    print("variants: " + ", ".join(f"{w}px {b:,} B" for w, b in sorted(sizes.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import load_merged, scale_up
+from components.preferences import build_city_vector, build_city_matrix, normalize
+
+
+def legacy_city_matrix(df):
+    # Row-by-row path the columnar engine replaced
+    city_df = pd.DataFrame([build_city_vector(row) for _, row in df.iterrows()])
+    city_df.index = df["City"]
+    return legacy_normalize(city_df)
+
+
+def legacy_normalize(df):
+    df_norm = df.copy()
+    for c in df.columns:
+        min_v, max_v = df[c].min(), df[c].max()
+        df_norm[c] = (df[c] - min_v) / (max_v - min_v) if max_v - min_v != 0 else 0
+    return df_norm
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale benchmark for build_city_matrix")
+    parser.add_argument("--max-exp", type=int, default=6)
+    parser.add_argument("--legacy-max-exp", type=int, default=4,
+                        help="largest 10^n for the row-by-row baseline (it is slow)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = load_merged()
+    print(f"{'rows':>10} {'columnar (s)':>14} {'legacy (s)':>12} {'speedup':>9}")
+    for exp in range(2, args.max_exp + 1):
+        df = scale_up(base, 10 ** exp)
+        fast = best_of(lambda: normalize(build_city_matrix(df)), args.repeat)
+        if exp <= args.legacy_max_exp:
+            slow = best_of(lambda: legacy_normalize(legacy_city_matrix(df)), 1)
+            print(f"{10 ** exp:>10} {fast:>14.4f} {slow:>12.4f} {slow / fast:>8.0f}x")
+        else:
+            print(f"{10 ** exp:>10} {fast:>14.4f} {'-':>12} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
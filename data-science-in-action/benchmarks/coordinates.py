@@ -0,0 +1,67 @@
+import argparse
+import time
+
+import numpy as np
+
+from pipeline.coordinates import OK, normalize
+
+
+def dms_strings(values, hemispheres):
+    # 48.2083 -> "48°12′30″N"
+    absolute = np.abs(values)
+    degrees = np.floor(absolute)
+    minutes = np.floor((absolute - degrees) * 60)
+    seconds = np.round(((absolute - degrees) * 60 - minutes) * 60)
+    letters = np.where(values < 0, hemispheres[1], hemispheres[0])
+    return [f"{d:.0f}°{m:.0f}′{s:.0f}″{h}" for d, m, s, h in zip(degrees, minutes, np.minimum(seconds, 59), letters)]
+
+
+def coordinate_strings(n, seed=0, broken=0.01):
+    # Half decimal, half DMS strings around Europe, with a share of junk rows
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(35, 70, n)
+    lon = rng.uniform(-10, 40, n)
+    dms = rng.random(n) < 0.5
+    lat_text = np.where(dms, dms_strings(lat, "NS"), np.round(lat, 5).astype(str)).astype(object)
+    lon_text = np.where(dms, dms_strings(lon, "EW"), np.round(lon, 5).astype(str)).astype(object)
+    junk = rng.random(n) < broken
+    lat_text[junk] = "n/a"
+    return lat_text, lon_text
+
+
+def scalar_parse(text):
+    # The notebook's per-string parser, for comparison
+    try:
+        if "°" not in text:
+            return float(text)
+        sign = -1 if text[-1] in "SW" else 1
+        d, m, s = text[:-1].replace("°", " ").replace("′", " ").replace("″", " ").split()
+        return round(sign * (float(d) + float(m) / 60 + float(s) / 3600), 6)
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch coordinate parsing throughput")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'batch (s)':>10} {'per-string (s)':>15} {'ok':>10} {'flagged':>8}")
+    for n in args.rows:
+        lat_text, lon_text = coordinate_strings(n)
+        start = time.perf_counter()
+        lat, lon, status = normalize(lat_text, lon_text)
+        batch = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [scalar_parse(t) for t in lat_text], [scalar_parse(t) for t in lon_text]
+        scalar = time.perf_counter() - start
+
+        ok = status == OK
+        assert np.allclose(lat[ok], np.array(expected[0], dtype=np.float64)[ok], rtol=0, atol=1e-6)
+        assert np.allclose(lon[ok], np.array(expected[1], dtype=np.float64)[ok], rtol=0, atol=1e-6)
+        print(f"{n:>10,} {batch:>10.3f} {scalar:>15.3f} {ok.sum():>10,} {(~ok).sum():>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import scale_up
+from components import data
+
+
+def legacy_load(data_dir):
+    # What each page did: parse every CSV with default dtypes, merge per run
+    tables = {name: pd.read_csv(os.path.join(data_dir, f)) for name, f in data.SOURCES.items()}
+    merged = tables["cities"].merge(tables["health"], on=["City", "Country"])
+    tables["merged"] = merged.merge(tables["environment"], on=["City", "Country"])
+    return tables
+
+
+def layer_load(data_dir, cache_dir):
+    data._load_table.cache_clear()
+    data._load_merged.cache_clear()
+    tables = {name: data.load_table(name, data_dir, cache_dir) for name in data.SOURCES}
+    tables["merged"] = data.load_merged(data_dir, cache_dir)
+    return tables
+
+
+def footprint(tables):
+    return sum(df.memory_usage(deep=True).sum() for df in tables.values())
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def write_scaled(data_dir, n_rows):
+    # Scale all four tables together so City/Country still join
+    keys = ["City", "Country"]
+    tables = {name: pd.read_csv(os.path.join(data.DATA_DIR, f)) for name, f in data.SOURCES.items()}
+    joined = tables["cities"]
+    for name in ("health", "environment", "transportation"):
+        joined = joined.merge(tables[name], on=keys)
+    joined = scale_up(joined, n_rows)
+    for name, f in data.SOURCES.items():
+        joined[list(tables[name].columns)].to_csv(os.path.join(data_dir, f), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load time and memory of the shared data layer")
+    parser.add_argument("--rows", type=int, nargs="+", default=[0, 100_000, 1_000_000],
+                        help="0 means the bundled data")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'mode':>16} {'load (s)':>9} {'memory (MB)':>12}")
+    for n in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir, cache_dir = data.DATA_DIR, os.path.join(tmp, "cache")
+            if n:
+                data_dir = os.path.join(tmp, "data")
+                os.makedirs(data_dir)
+                write_scaled(data_dir, n)
+            label = n or len(pd.read_csv(os.path.join(data_dir, data.SOURCES["cities"])))
+            for mode, fn in [
+                ("csv per page", lambda: legacy_load(data_dir)),
+                ("layer, cold", lambda: layer_load(data_dir, cache_dir)),
+                ("layer, warm", lambda: layer_load(data_dir, cache_dir)),
+            ]:
+                tables, seconds = timed(fn)
+                print(f"{label:>9} {mode:>16} {seconds:>9.3f} {footprint(tables) / 2**20:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
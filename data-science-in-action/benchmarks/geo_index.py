@@ -0,0 +1,94 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import load_merged, scale_up
+from components.geo_index import GeoIndex, haversine
+
+# (label, radius in km) for within-radius queries
+RADII = [("city", 25), ("region", 100), ("country", 500), ("continent", 2000)]
+NEAREST = 10
+# Cell sizes for the antimeridian check; 7 degrees does not divide 360
+ANTIMERIDIAN_CELLS = [None, 7.0]
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def brute_within(lat, lon, qlat, qlon, radius_km):
+    return np.flatnonzero(haversine(qlat, qlon, lat, lon) <= radius_km)
+
+
+def brute_nearest(lat, lon, qlat, qlon, n):
+    distances = haversine(qlat, qlon, lat, lon)
+    return np.argsort(distances, kind="stable")[:n]
+
+
+def antimeridian(df, centres):
+    # Rotate every longitude so the median city sits on the antimeridian, then
+    # check radius and nearest queries whose circles cross it against brute force
+    lat = df["Latitude"].to_numpy(dtype=np.float64)
+    shift = 180 - np.nanmedian(df["Longitude"].to_numpy(dtype=np.float64))
+    lon = (df["Longitude"].to_numpy(dtype=np.float64) + shift + 180) % 360 - 180
+    rotated = df.assign(Longitude=lon)
+    centres = np.column_stack([centres[:, 0], (centres[:, 1] + shift + 180) % 360 - 180])
+    checked = 0
+    for cell in ANTIMERIDIAN_CELLS:
+        index = GeoIndex(rotated, cell_deg=cell)
+        for qlat, qlon in centres:
+            for _, radius in RADII:
+                assert np.array_equal(index.within(qlat, qlon, radius), brute_within(lat, lon, qlat, qlon, radius))
+            assert np.array_equal(index.nearest(qlat, qlon, NEAREST)[0], brute_nearest(lat, lon, qlat, qlon, NEAREST))
+            checked += len(RADII) + 1
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Radius and nearest-city query latency with and without GeoIndex")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    merged = load_merged()
+    for n in args.rows:
+        df = scale_up(merged, n, jitter=0.05)
+        lat, lon = df["Latitude"].to_numpy(dtype=np.float64), df["Longitude"].to_numpy(dtype=np.float64)
+        start = time.perf_counter()
+        index = GeoIndex(df)
+        print(f"\nrows: {n:,}  index build: {time.perf_counter() - start:.3f}s  cell: {index.cell_deg:.3f} deg")
+        # Query around the real cities
+        centres = merged[["Latitude", "Longitude"]].to_numpy()[:args.queries]
+
+        print(f"{'query':>14} {'matches':>10} {'index (ms)':>11} {'brute (ms)':>11}")
+        for label, radius in RADII:
+            found = expected = 0
+            fast = slow = 0.0
+            for qlat, qlon in centres:
+                result, t = per_call(lambda: index.within(qlat, qlon, radius), 3)
+                reference, u = per_call(lambda: brute_within(lat, lon, qlat, qlon, radius), 1)
+                assert np.array_equal(result, reference)
+                found += len(result)
+                fast += t
+                slow += u
+            k = len(centres)
+            print(f"{label + f' {radius}km':>14} {found // k:>10,} {fast / k * 1e3:>11.3f} {slow / k * 1e3:>11.3f}")
+
+        fast = slow = 0.0
+        for qlat, qlon in centres:
+            (result, _), t = per_call(lambda: index.nearest(qlat, qlon, NEAREST), 3)
+            reference, u = per_call(lambda: brute_nearest(lat, lon, qlat, qlon, NEAREST), 1)
+            assert np.array_equal(result, reference)
+            fast += t
+            slow += u
+        k = len(centres)
+        print(f"{f'nearest {NEAREST}':>14} {NEAREST:>10,} {fast / k * 1e3:>11.3f} {slow / k * 1e3:>11.3f}")
+        print(f"antimeridian: {antimeridian(df, centres):,} queries match brute force")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Rerun latency of the Recommendation page with a search on screen.
+
+Times full script reruns (headless, via AppTest) and, from the profiling
+records, the results and map fragments a widget inside them reruns alone.
+--ref also measures the page as of a git ref, for a before/after table:
+
+    PYTHONPATH=data-science-in-action python -m benchmarks.page_rerun --ref HEAD
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from components import profiling
+
+PAGE = "data-science-in-action/pages/Recommendation System.py"
+FRAGMENTS = ["results fragment", "map fragment"]
+
+
+def page_at(ref, tmp):
+    # The page as it was at a git ref, written to a temporary file
+    source = subprocess.run(["git", "show", f"{ref}:{PAGE}"], capture_output=True, text=True, check=True).stdout
+    path = os.path.join(tmp, f"page-{ref.replace('/', '_')}.py")
+    with open(path, "w") as f:
+        f.write(source)
+    return path
+
+
+def measure(path, repeat):
+    # Full script reruns with a search on screen, which is what every sidebar
+    # change cost before the form; plus the fragment bodies, which are all a
+    # pagination click reruns when the page uses fragments
+    profiling.enable()
+    at = AppTest.from_file(path, default_timeout=120).run()
+    at.button[0].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+    profiling.clear()
+    full = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        full.append(time.perf_counter() - start)
+    records = profiling.records()
+    fragments = {
+        stage: records.loc[records["stage"] == stage, "seconds"].median()
+        for stage in FRAGMENTS if (records["stage"] == stage).any()
+    }
+    return statistics.median(full), fragments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rerun latency of the Recommendation page")
+    parser.add_argument("--ref", default=None, help="also measure the page as of this git ref")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = [("working tree", PAGE)]
+        if args.ref:
+            pages.insert(0, (args.ref, page_at(args.ref, tmp)))
+        print(f"{'page':>14} {'full rerun (ms)':>16} " + " ".join(f"{f + ' (ms)':>22}" for f in FRAGMENTS))
+        for label, path in pages:
+            full, fragments = measure(path, args.repeat)
+            cells = " ".join(
+                f"{fragments[f] * 1e3:>22.2f}" if f in fragments else f"{'-':>22}" for f in FRAGMENTS
+            )
+            print(f"{label:>14} {full * 1e3:>16.2f} {cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import load_merged, scale_up
+from components.comparison import WHOLE_NUMBERS, MetricMatrix, metric_matrix
+from components.highlighter import directions
+from components.pareto import DEFAULT_OBJECTIVES, OBJECTIVES as LABELS, ParetoEngine
+
+# Objective sets from 2 to 6 metrics: sort-based skyline up to 3, block-nested loop above
+OBJECTIVES = [
+    ["Average Cost of Living", "Average Monthly Salary"],
+    ["Average Cost of Living", "Average Monthly Salary", "Air Quality Index"],
+    ["Average Cost of Living", "Average Monthly Salary", "Air Quality Index", "Unemployment Rate"],
+    ["Average Cost of Living", "Average Monthly Salary", "Air Quality Index", "Unemployment Rate",
+     "Average Rent Price", "Life Expectancy (Years)"],
+]
+# Objective sets checked on the real cities: every 3 of the defaults and the
+# metrics the tables show cut to whole numbers
+REAL_OBJECTIVES = [list(c) for c in itertools.combinations(DEFAULT_OBJECTIVES + WHOLE_NUMBERS, 3)] + OBJECTIVES
+# Largest table the quadratic all-pairs check is run on
+MAX_PAIRWISE = 20_000
+
+
+def pairwise_front(points):
+    # Every row against every row, in chunks: the O(n^2) reference
+    dominated = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), 256):
+        chunk = points[start:start + 256]
+        weakly = (chunk[:, None, :] <= points[None, :, :]).all(axis=2)
+        strictly = (chunk[:, None, :] < points[None, :, :]).any(axis=2)
+        dominated |= (weakly & strictly).any(axis=0)
+    return ~dominated
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def check_real(merged):
+    # The page's engine against the all-pairs front of the raw CSV values
+    matrix = metric_matrix()
+    engine = ParetoEngine(matrix)
+    positions = matrix.positions(merged["City"].astype(str))
+    for objectives in REAL_OBJECTIVES:
+        costs = merged[objectives].to_numpy(dtype=np.float64) * -directions([LABELS[c] for c in objectives])
+        rows = np.flatnonzero(~np.isnan(costs).any(axis=1))
+        expected = set(merged["City"].iloc[rows[pairwise_front(costs[rows])]])
+        front, _ = engine.fronts(objectives, positions, max_fronts=1)
+        assert set(matrix.cities[front]) == expected, objectives
+    return len(REAL_OBJECTIVES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pareto front latency by table size and number of objectives")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--fronts", type=int, default=5, help="successive fronts to peel")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = load_merged()
+    print(f"real cities: {check_real(base)} objective sets match the all-pairs front")
+    columns = sorted({col for objectives in OBJECTIVES for col in objectives})
+    print(f"{'rows':>10} {'objectives':>10} {'front':>7} {'front (ms)':>11} {f'{args.fronts} fronts (ms)':>15} {'pairwise (ms)':>14}")
+    for n in args.rows:
+        df = scale_up(base, n, jitter=0.05)
+        engine = ParetoEngine(MetricMatrix(pd.DataFrame(df[columns].to_numpy(dtype=np.float64), columns=columns)))
+        for objectives in OBJECTIVES:
+            (positions, _), fast = per_call(lambda: engine.fronts(objectives, max_fronts=1), args.repeat)
+            _, peeled = per_call(lambda: engine.fronts(objectives, max_fronts=args.fronts), 1)
+            slow = "-"
+            if n <= MAX_PAIRWISE:
+                reference, t = per_call(lambda: pairwise_front(engine.points(objectives)), 1)
+                assert np.array_equal(positions, np.flatnonzero(reference))
+                slow = f"{t * 1e3:.1f}"
+            print(f"{n:>10,} {len(objectives):>10} {len(positions):>7,} {fast * 1e3:>11.1f} {peeled * 1e3:>15.1f} {slow:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import load_merged, scale_up
+from components.range_index import RangeIndex
+
+# (label, salary >=, rent <=, cost of living <=) from tight to loose
+QUERIES = [
+    ("tight", 3000, 300, 900),
+    ("narrow", 4000, 700, 1400),
+    ("medium", 3000, 800, 1500),
+    ("default", 3000, 1050, 1800),
+    ("loose", 1000, 2500, 4000),
+]
+
+
+def mask_scan(df, pref):
+    # Boolean-mask filter find_matching uses without an index
+    mask = (
+        (df["Average Rent Price"] <= pref["Average Rent Price"]) &
+        (df["Average Cost of Living"] <= pref["Average Cost of Living"]) &
+        (df["Average Monthly Salary"] >= pref["Average Monthly Salary"])
+    )
+    return np.flatnonzero(mask.to_numpy())
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Range-constraint query latency with and without RangeIndex")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    df = scale_up(load_merged(), args.rows, jitter=0.05)
+    start = time.perf_counter()
+    index = RangeIndex(df)
+    print(f"rows: {args.rows:,}  index build: {time.perf_counter() - start:.3f}s\n")
+
+    print(f"{'query':>8} {'matches':>9} {'index (ms)':>11} {'mask scan (ms)':>15}")
+    for label, salary, rent, cost in QUERIES:
+        pref = {"Average Monthly Salary": salary, "Average Rent Price": rent, "Average Cost of Living": cost}
+        found, fast = per_call(lambda: index.positions(pref), args.repeat)
+        expected, slow = per_call(lambda: mask_scan(df, pref), max(1, args.repeat // 10))
+        assert np.array_equal(found, expected)
+        print(f"{label:>8} {len(found):>9,} {fast * 1e3:>11.3f} {slow * 1e3:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import load_merged, scale_up
+from components.range_index import RangeIndex
+from components.ranking import PercentileRanker, SCORE_WEIGHTS
+
+PREF = {"Average Monthly Salary": 2000, "Average Rent Price": 1200, "Average Cost of Living": 2500}
+WEIGHTS = {
+    "default": SCORE_WEIGHTS,
+    "salary-heavy": {"GDP per Capita": 0.5, "Average Monthly Salary": 2.0, "Unemployment Rate": -1.0},
+}
+
+
+def pandas_rank(df, positions, weights):
+    # What find_matching does without a ranker: rank the subset, sort it all
+    filtered = df.take(positions)
+    score = sum(w * filtered[c].rank(pct=True) for c, w in weights.items())
+    return filtered.assign(score=score).sort_values("score", ascending=False, kind="stable")
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subset percentile ranking with and without PercentileRanker")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--page-size", type=int, default=9)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = load_merged()
+    print(f"{'rows':>9} {'matches':>9} {'weights':>13} {'pandas (ms)':>12} {'ranker top page (ms)':>21} {'ranker full (ms)':>17}")
+    for n in args.rows:
+        df = scale_up(base, n, jitter=0.05)
+        positions = RangeIndex(df).positions(PREF)
+        ranker = PercentileRanker(df)
+        for label, weights in WEIGHTS.items():
+            expected = pandas_rank(df, positions, weights).index
+            ranked = ranker.rank(positions, weights)
+            assert df.index[ranked.positions[ranked.order()]].equals(expected)
+            slow = per_call(lambda: pandas_rank(df, positions, weights), args.repeat)
+            page = per_call(lambda: ranker.rank(positions, weights).page(0, args.page_size), args.repeat)
+            full = per_call(lambda: ranker.rank(positions, weights).order(), args.repeat)
+            print(f"{n:>9} {len(positions):>9} {label:>13} {slow * 1e3:>12.2f} {page * 1e3:>21.2f} {full * 1e3:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import load_merged, scale_up
+from components.answer_table import QUESTIONS
+from components.preferences import build_city_matrix, build_user_vector
+from components.scoring import CityScorer
+
+WEEKEND, HOME, SOCIAL, RHYTHM = (QUESTIONS[q] for q in ("weekend", "home", "social", "rhythm"))
+
+
+def random_answers(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "weekend": WEEKEND[rng.integers(3)], "home": HOME[rng.integers(3)],
+            "social": SOCIAL[rng.integers(3)], "rhythm": RHYTHM[rng.integers(3)],
+            "adventure": int(rng.integers(11)),
+        }
+        for _ in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the batched cosine scorer")
+    parser.add_argument("--cities", type=int, nargs="+", default=[84, 10_000, 100_000])
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    base = load_merged()
+    users = [build_user_vector(a) for a in random_answers(max(args.batches))]
+
+    print(f"{'cities':>8} {'batch':>6} {'build (ms)':>11} {'query (ms)':>11} {'responses/s':>12}")
+    for n in args.cities:
+        city_df = build_city_matrix(scale_up(base, n) if n != len(base) else base)
+        start = time.perf_counter()
+        scorer = CityScorer(city_df)
+        build = time.perf_counter() - start
+        for batch in args.batches:
+            start = time.perf_counter()
+            scorer.top_k(users[:batch], args.k)
+            query = time.perf_counter() - start
+            print(f"{n:>8} {batch:>6} {build * 1e3:>11.2f} {query * 1e3:>11.2f} {batch / query:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.scoring import random_answers
+from benchmarks.synthetic import load_merged, scale_up
+from components.preferences import build_city_matrix, build_user_vector
+from components.scoring import CityScorer
+from components.sensitivity import WeightExplorer
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-ranking after a weight change: rank-1 update vs full product")
+    parser.add_argument("--cities", type=int, nargs="+", default=[84, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--changes", type=int, default=200, help="single-weight changes to replay")
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    base = load_merged()
+    user = build_user_vector(random_answers(1)[0])
+    rng = np.random.default_rng(0)
+    print(f"{'cities':>10} {'full (ms)':>10} {'rank-1 (ms)':>12} {'speedup':>8} {'stability (ms)':>15} {'events':>7}")
+    for n in args.cities:
+        scorer = CityScorer(build_city_matrix(scale_up(base, n) if n != len(base) else base))
+        explorer = WeightExplorer(scorer, user)
+        weights = dict(user)
+        # The same sequence of slider moves for both
+        dims = rng.integers(len(scorer.params), size=args.changes)
+        values = np.round(rng.uniform(-1, 1, args.changes), 2)
+        changes = [(scorer.params[j], float(v)) for j, v in zip(dims, values)]
+
+        # What a rerun costs without the explorer: rescore every city
+        start = time.perf_counter()
+        for param, value in changes:
+            weights[param] = value
+            full = scorer.recommend(weights, args.k)
+        full_time = (time.perf_counter() - start) / len(changes)
+
+        start = time.perf_counter()
+        for param, value in changes:
+            explorer.set_weight(param, value)
+            fast = explorer.top(args.k)
+        fast_time = (time.perf_counter() - start) / len(changes)
+        assert fast[0] == full[0] and np.allclose(fast[1], full[1], atol=1e-9)
+
+        events, stability = per_call(lambda: explorer.stability(args.k), 3)
+        print(f"{n:>10,} {full_time * 1e3:>10.3f} {fast_time * 1e3:>12.3f} {full_time / fast_time:>7.1f}x "
+              f"{stability * 1e3:>15.2f} {len(events):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Load test for the recommendation service (service.app).
+
+Sends requests over keep-alive connections from a pool of asyncio workers
+and reports throughput and p50/p90/p99 latency. --serve starts a local
+uvicorn instance first; otherwise point --url at a running one.
+
+    PYTHONPATH=data-science-in-action python -m benchmarks.service_load --serve --endpoint recommend
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.scoring import random_answers
+from benchmarks.suite import random_preferences
+from components.data import load_cities
+from components.languages import LanguageIndex
+
+ENDPOINTS = ["match", "recommend", "match/batch", "recommend/batch"]
+
+
+def request_bodies(endpoint, n, batch, seed=0):
+    if endpoint.startswith("match"):
+        cities = load_cities()
+        items = [
+            {"user_language": lang, "pref": pref}
+            for lang, pref in random_preferences(cities, LanguageIndex(cities), n * batch, seed)
+        ]
+    else:
+        items = [{"answers": a, "top_n": 3} for a in random_answers(n * batch, seed)]
+    if endpoint.endswith("/batch"):
+        return [json.dumps({"requests": items[i:i + batch]}).encode() for i in range(0, len(items), batch)]
+    return [json.dumps(item).encode() for item in items]
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def worker(host, port, path, bodies, counter, n, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    head = f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+    try:
+        for i in counter:
+            if i >= n:
+                break
+            body = bodies[i % len(bodies)]
+            start = time.perf_counter()
+            writer.write(f"{head}Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(url, endpoint, bodies, n, concurrency):
+    parts = urlsplit(url)
+    path = f"{parts.path.rstrip('/')}/{endpoint}"
+    counter = itertools.count()
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(parts.hostname, parts.port or 80, path, bodies, counter, n, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    return np.array(latencies), errors, time.perf_counter() - start
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(workers, timeout=120):
+    # Local uvicorn instance on a free port; returns (process, base url)
+    port = free_port()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, ["data-science-in-action", os.environ.get("PYTHONPATH")]))}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "service.app:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=1) as r:
+                if r.status == 200:
+                    return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Service did not start in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput of the recommendation service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="start a local uvicorn instance first")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --serve")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, nargs="+", default=ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=50, help="items per request on /batch endpoints")
+    args = parser.parse_args()
+
+    process = None
+    if args.serve:
+        process, args.url = serve(args.workers)
+    try:
+        print(f"{'endpoint':>16} {'requests':>9} {'errors':>7} {'req/s':>9} {'items/s':>10} "
+              f"{'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9}")
+        for endpoint in args.endpoint:
+            batch = args.batch if endpoint.endswith("/batch") else 1
+            bodies = request_bodies(endpoint, min(args.requests, 1_000), batch)
+            latencies, errors, seconds = asyncio.run(
+                run_load(args.url, endpoint, bodies, args.requests, args.concurrency)
+            )
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1e3
+            rate = len(latencies) / seconds
+            print(f"{endpoint:>16} {len(latencies):>9} {len(errors):>7} {rate:>9.0f} {rate * batch:>10.0f} "
+                  f"{p50:>9.2f} {p90:>9.2f} {p99:>9.2f}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
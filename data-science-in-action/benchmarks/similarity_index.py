@@ -0,0 +1,58 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.scoring import random_answers
+from benchmarks.synthetic import load_merged, scale_up
+from components.preferences import build_city_matrix, build_user_vector
+from components.similarity import build_index
+
+
+def jittered_matrix(n, seed=0, noise=0.02):
+    # Bootstrapped rows repeat exactly; a little noise keeps neighbours distinct
+    city_df = build_city_matrix(scale_up(load_merged(), n, seed=seed))
+    rng = np.random.default_rng(seed)
+    values = np.clip(city_df.to_numpy() + rng.normal(0, noise, city_df.shape), 0, 1)
+    return pd.DataFrame(values, index=city_df.index, columns=city_df.columns)
+
+
+def timed_query(index, users, k, **kwargs):
+    start = time.perf_counter()
+    idx, _ = index.top_k(users, k, **kwargs)
+    return idx, (time.perf_counter() - start) / len(users)
+
+
+def recall(found, truth):
+    return np.mean([len(np.intersect1d(f, t)) / len(t) for f, t in zip(found, truth)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency of the similarity index backends")
+    parser.add_argument("--cities", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    city_df = jittered_matrix(args.cities)
+    users = [build_user_vector(a) for a in random_answers(args.queries, seed=1)]
+
+    start = time.perf_counter()
+    exact = build_index(city_df, kind="exact")
+    print(f"exact build: {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    ivf = build_index(city_df, kind="ivf")
+    print(f"ivf build:   {time.perf_counter() - start:.2f}s ({ivf.options['n_lists']} lists)")
+
+    truth, exact_latency = timed_query(exact, users, args.k, block=len(city_df))
+    print(f"\n{'backend':>10} {'n_probe':>8} {'recall@' + str(args.k):>10} {'ms/query':>9}")
+    print(f"{'exact':>10} {'-':>8} {1.0:>10.3f} {exact_latency * 1e3:>9.3f}")
+    for n_probe in args.probes:
+        found, latency = timed_query(ivf, users, args.k, n_probe=n_probe)
+        print(f"{'ivf':>10} {n_probe:>8} {recall(found, truth):>10.3f} {latency * 1e3:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
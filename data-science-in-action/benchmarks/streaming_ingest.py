@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline import ingest
+
+RAW_PATH = "data/city_data.csv"
+
+
+def write_raw(path, n_rows, duplicates=0.1, seed=0, block=200_000):
+    # Raw-layout file of bootstrapped rows: unique city names that keep the
+    # dirty ',', '.' and ';' separators, plus a share of repeated rows
+    with open(RAW_PATH) as f:
+        title = f.readline()
+    raw = pd.read_csv(RAW_PATH, sep='|', skiprows=1)
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as f:
+        f.write(title)
+        raw.head(0).to_csv(f, sep='|', index=False)
+        for start in range(0, n_rows, block):
+            n = min(block, n_rows - start)
+            ids = np.arange(start, start + n)
+            # The duplicate share repeats an earlier row id; a row's content
+            # depends only on its id, so repeats are exact duplicates
+            repeat = rng.random(n) < duplicates
+            ids = np.where(repeat & (ids > 0), rng.integers(0, np.maximum(ids, 1)), ids)
+            out = raw.iloc[(ids * 7919) % len(raw)].reset_index(drop=True)
+            parts = out["City"].str.extract(r"^([^,.;]*)(.*)$")
+            out["City"] = parts[0] + "-" + pd.Series(ids).astype(str) + parts[1]
+            out.to_csv(f, sep='|', index=False, header=False)
+
+
+def eager(path, out_path):
+    df = ingest.normalize_chunk(pd.read_csv(path, sep='|', skiprows=1))
+    df = df.drop_duplicates()
+    df.to_parquet(out_path, index=False)
+    return len(df)
+
+
+def streaming(path, out_path):
+    return ingest.ingest(path, out_path)["rows_out"]
+
+
+MODES = {"eager": eager, "streaming": streaming}
+
+
+def child(mode, path):
+    # Run one mode in this process and report its wall time and peak RSS
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        rows = MODES[mode](path, os.path.join(tmp, "out.parquet"))
+        seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"rows": rows, "seconds": seconds, "peak_mb": peak_mb}))
+
+
+def measure(mode, path):
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.streaming_ingest", "--child", mode, path],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of eager vs streaming raw ingestion")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'rows':>9} {'file (MB)':>10} {'mode':>10} {'unique':>9} {'time (s)':>9} {'peak (MB)':>10}")
+    for n in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "raw.csv")
+            write_raw(path, n)
+            size = os.path.getsize(path) / 2**20
+            for mode in args.modes:
+                r = measure(mode, path)
+                print(f"{n:>9} {size:>10.1f} {mode:>10} {r['rows']:>9} {r['seconds']:>9.2f} {r['peak_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
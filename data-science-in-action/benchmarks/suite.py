@@ -0,0 +1,163 @@
+"""Benchmark sweep of the matching and recommendation engines.
+
+Times find_matching (plain and with the page indexes), build_city_matrix,
+normalize, build_user_vector and recommend_cities over synthetic data sizes
+and query batch sizes, and writes the results as JSON so runs from different
+commits can be compared. Headless: nothing here imports Streamlit.
+
+    PYTHONPATH=data-science-in-action python -m benchmarks.suite --rows 1000 100000
+    PYTHONPATH=data-science-in-action python -m benchmarks.suite --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.scoring import random_answers
+from benchmarks.synthetic import synthetic_tables
+from components.languages import LanguageIndex
+from components.matching import find_matching
+from components.preferences import build_city_matrix, build_user_vector, normalize, recommend_cities
+from components.range_index import RangeIndex
+from components.ranking import PercentileRanker
+from components.scoring import CityScorer
+
+RESULTS_DIR = os.path.join("data-science-in-action", "benchmarks", "results")
+
+
+def random_preferences(df, languages, n, seed=0):
+    # Page-style queries: thresholds drawn from each column's own quantiles
+    rng = np.random.default_rng(seed)
+    options = ["Any"] + languages.options()
+
+    def quantile(col):
+        return float(df[col].quantile(rng.uniform(0.2, 0.9)))
+
+    return [
+        (
+            options[rng.integers(len(options))] if rng.random() < 0.5 else "Any",
+            {
+                "Unemployment Rate": quantile("Unemployment Rate"),
+                "GDP per Capita": quantile("GDP per Capita"),
+                "Average Monthly Salary": float(df["Average Monthly Salary"].quantile(rng.uniform(0.1, 0.6))),
+                "Average Rent Price": quantile("Average Rent Price"),
+                "Average Cost of Living": quantile("Average Cost of Living"),
+            },
+        )
+        for _ in range(n)
+    ]
+
+
+def best_of(fn, repeat):
+    # Fastest of repeat runs, in seconds
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def sweep(rows, batches, repeat, seed=0, log=print):
+    results = []
+
+    def record(function, n, batch, seconds):
+        results.append({
+            "function": function, "rows": n, "batch": batch,
+            "seconds": seconds, "per_call": seconds / max(batch, 1),
+        })
+        log(f"{function:>24} {n:>10} {batch:>6} {seconds * 1e3:>12.3f} {seconds / max(batch, 1) * 1e6:>12.1f}")
+
+    answers = random_answers(max(batches), seed)
+    for n in rows:
+        tables = synthetic_tables(n, seed=seed)
+        cities = tables["cities"]
+        merged = cities.merge(tables["health"], on=["City", "Country"]).merge(tables["environment"], on=["City", "Country"])
+
+        record("build_city_matrix", n, 1, best_of(lambda: build_city_matrix(merged), repeat))
+        city_matrix = build_city_matrix(merged)
+        record("normalize", n, 1, best_of(lambda: normalize(city_matrix), repeat))
+        city_norm = normalize(city_matrix)
+        record("CityScorer", n, 1, best_of(lambda: CityScorer(city_norm), repeat))
+        scorer = CityScorer(city_norm)
+
+        start = time.perf_counter()
+        indexes = {"index": RangeIndex(cities), "languages": LanguageIndex(cities), "ranker": PercentileRanker(cities)}
+        record("find_matching indexes", n, 1, time.perf_counter() - start)
+        prefs = random_preferences(cities, indexes["languages"], max(batches), seed)
+
+        for batch in batches:
+            batch_answers, batch_prefs = answers[:batch], prefs[:batch]
+            record("build_user_vector", n, batch,
+                   best_of(lambda: [build_user_vector(a) for a in batch_answers], repeat))
+            users = [build_user_vector(a) for a in batch_answers]
+            record("recommend_cities", n, batch,
+                   best_of(lambda: [recommend_cities(u, city_norm, scorer=scorer) for u in users], repeat))
+            record("find_matching", n, batch,
+                   best_of(lambda: [find_matching(cities, lang, pref) for lang, pref in batch_prefs], repeat))
+            record("find_matching indexed", n, batch,
+                   best_of(lambda: [find_matching(cities, lang, pref, **indexes) for lang, pref in batch_prefs], repeat))
+    return results
+
+
+def compare(old_path, new_path):
+    frames = []
+    for path in (old_path, new_path):
+        with open(path) as f:
+            frames.append(pd.DataFrame(json.load(f)["results"]).set_index(["function", "rows", "batch"])["per_call"])
+    table = pd.concat(frames, axis=1, keys=["old", "new"], join="inner")
+    table["ratio"] = table["new"] / table["old"]
+    print(table.to_string(float_format=lambda x: f"{x:.6g}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the matching and recommendation engines over data and batch sizes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000],
+                        help="synthetic table sizes, up to 10^7")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="print per-call ratios of two result files")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    print(f"{'function':>24} {'rows':>10} {'batch':>6} {'total (ms)':>12} {'per call (us)':>12}")
+    results = sweep(args.rows, args.batches, args.repeat, args.seed)
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "repeat": args.repeat,
+            "results": results,
+        }, f, indent=1)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+CITY_URL = "data/city_data_with_coordinates.csv"
+HEALTH_URL = "data/health.csv"
+ENV_URL = "data/environment.csv"
+
+
+def load_merged():
+    cities = pd.read_csv(CITY_URL)
+    cities = cities.merge(pd.read_csv(HEALTH_URL), on=["City", "Country"])
+    return cities.merge(pd.read_csv(ENV_URL), on=["City", "Country"])
+
+
+def scale_up(df, n_rows, seed=0, jitter=0.0):
+    # Bootstrap rows of the real table so every column keeps its distribution,
+    # then give each synthetic city a unique name. jitter > 0 applies that much
+    # relative Gaussian noise to numeric columns so values are not all repeats.
+    rng = np.random.default_rng(seed)
+    out = df.iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+    out["City"] = out["City"] + "-" + pd.RangeIndex(n_rows).astype(str)
+    if jitter:
+        for col in out.select_dtypes("number").columns:
+            noisy = out[col] * (1 + rng.normal(0, jitter, n_rows))
+            out[col] = noisy.round().astype(out[col].dtype) if out[col].dtype.kind == "i" else noisy
+    return out
+
+
+def synthetic_tables(n_rows, seed=0, jitter=0.05):
+    # City, health and environment tables of n_rows each, in the CSV schemas.
+    # Rows are bootstrapped from the joined tables, so the keys still join
+    # one-to-one and each column keeps its distribution.
+    keys = ["City", "Country"]
+    sources = {"cities": CITY_URL, "health": HEALTH_URL, "environment": ENV_URL}
+    tables = {name: pd.read_csv(url) for name, url in sources.items()}
+    joined = tables["cities"].merge(tables["health"], on=keys).merge(tables["environment"], on=keys)
+    joined = scale_up(joined, n_rows, seed=seed, jitter=jitter)
+    return {name: joined[list(df.columns)].astype(df.dtypes.to_dict()) for name, df in tables.items()}
@@ -0,0 +1,109 @@
+import hashlib
+import inspect
+import itertools
+import json
+import os
+
+import numpy as np
+
+from components.preferences import build_user_vector
+from components.profiling import profiled
+from components.scoring import CityScorer
+from components.similarity import CACHE_DIR, matrix_version
+
+# The Life Style Match questionnaire: every radio option and slider value
+QUESTIONS = {
+    "weekend": ["Hiking or being in nature", "Cafés, museums, slow walks", "Bars, clubs, and nightlife"],
+    "home": ["Small but central", "Spacious and quiet", "Flexible, I adapt easily"],
+    "social": ["Work and professional networks", "Community events and hobbies", "Expat or international circles"],
+    "rhythm": ["Early mornings", "Balanced schedule", "Late nights"],
+    "adventure": list(range(11)),
+}
+
+_POSITIONS = {q: {option: i for i, option in enumerate(options)} for q, options in QUESTIONS.items()}
+
+
+def answer_sets():
+    # All 3*3*3*3*11 = 891 answer dicts, in answer_code order
+    for combo in itertools.product(*QUESTIONS.values()):
+        yield dict(zip(QUESTIONS, combo))
+
+
+def answer_code(answers):
+    # Row of an answer set in the table (mixed radix over QUESTIONS)
+    code = 0
+    for q, options in QUESTIONS.items():
+        code = code * len(options) + _POSITIONS[q][answers[q]]
+    return code
+
+
+def table_version(city_df, k, scorer=None):
+    # Changes with the city matrix, the scorer's backend and options (an
+    # approximate index may rank differently), the questionnaire or
+    # build_user_vector. No scorer means the exact CityScorer.
+    kind = getattr(scorer, "kind", "exact")
+    tag = "-".join(f"{name}{value}" for name, value in sorted(getattr(scorer, "options", {}).items()))
+    h = hashlib.sha1(f"{matrix_version(city_df)}:{k}:{kind}:{tag}".encode())
+    h.update(json.dumps(QUESTIONS).encode())
+    h.update(inspect.getsource(build_user_vector).encode())
+    return h.hexdigest()[:16]
+
+
+class AnswerTable:
+    """Top-k cities and scores for every questionnaire answer set.
+
+    Built once per dataset version by scoring all 891 answer sets; a form
+    submission is then a single row lookup.
+    """
+
+    def __init__(self, cities, idx, scores, version):
+        self.cities = np.asarray(cities)
+        self.idx = idx
+        self.scores = scores
+        self.version = version
+
+    @property
+    def k(self):
+        return self.idx.shape[1]
+
+    @classmethod
+    @profiled("answer_table.build")
+    def build(cls, city_df, scorer=None, k=3):
+        version = table_version(city_df, k, scorer)
+        scorer = scorer or CityScorer(city_df)
+        k = min(k, len(scorer.cities))
+        # One query per answer set, exactly as the page scores a submission
+        # (a batched matmul may differ from it in the last bit)
+        rows = [scorer.top_k(build_user_vector(a), k) for a in answer_sets()]
+        idx = np.vstack([r[0] for r in rows]).astype(np.int32)
+        return cls(scorer.cities, idx, np.vstack([r[1] for r in rows]), version)
+
+    def recommend(self, answers, top_n=3):
+        # Same (cities, scores) as recommend_cities for these answers
+        if top_n > self.k:
+            raise ValueError(f"Table holds the top {self.k} cities, {top_n} requested")
+        row = answer_code(answers)
+        return self.cities[self.idx[row, :top_n]].tolist(), self.scores[row, :top_n].tolist()
+
+    def save(self, path):
+        np.savez(path, cities=self.cities.astype(str), idx=self.idx, scores=self.scores, version=self.version)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["cities"].astype(object), data["idx"], data["scores"], str(data["version"]))
+
+
+@profiled()
+def cached_table(city_df, scorer=None, k=3, cache_dir=CACHE_DIR):
+    # One table file per version; a new dataset version gets a new file
+    path = os.path.join(cache_dir, f"answers-{table_version(city_df, k, scorer)}.npz")
+    if os.path.exists(path):
+        return AnswerTable.load(path)
+    table = AnswerTable.build(city_df, scorer, k)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        table.save(f)
+    os.replace(tmp, path)
+    return table
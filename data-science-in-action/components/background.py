@@ -1,17 +1,93 @@
 import streamlit as st
 import base64
+import functools
+import hashlib
+import io
+import os
+from PIL import Image
+from components.profiling import profiled
 
-def add_bg(image_file):
+# Served by Streamlit at app/static/ when server.enableStaticServing is on
+STATIC_DIR = "data-science-in-action/static"
+STATIC_URL = "app/static"
+VARIANT_DIR = "backgrounds"
+
+# Widths generated for the viewport; the inline fallback uses INLINE_WIDTH
+WIDTHS = (1280, 1920, 2560)
+INLINE_WIDTH = 1280
+QUALITY = 80
+
+
+def source_digest(image_file):
     with open(image_file, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode()
-    css = f"""
-    <style>
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+def encode_variant(image_file, width, quality=QUALITY):
+    # WebP bytes of the image scaled down to `width` (never up)
+    with Image.open(image_file) as im:
+        im = im.convert("RGB")
+        if im.width > width:
+            im = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        im.save(out, "WEBP", quality=quality)
+    return out.getvalue()
+
+
+def build_variants(image_file, out_dir=os.path.join(STATIC_DIR, VARIANT_DIR), widths=WIDTHS):
+    # {width: file name}; files are named by source digest, so an edited image
+    # gets new names and never collides with a browser-cached one
+    stem = os.path.splitext(os.path.basename(image_file))[0]
+    digest = source_digest(image_file)
+    os.makedirs(out_dir, exist_ok=True)
+    variants = {}
+    for width in widths:
+        name = f"{stem}-{width}-{digest}.webp"
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(encode_variant(image_file, width))
+            os.replace(tmp, path)
+        variants[width] = name
+    return variants
+
+
+def _rule(url):
+    return f"""
     .stApp {{
-        background-image: url('data:image/jpeg;base64,{encoded}');
+        background-image: url('{url}');
         background-size: cover;
         background-position: center;
         background-repeat: no-repeat;
-    }}
-    </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
\ No newline at end of file
+    }}"""
+
+
+def static_css(variants):
+    # Smallest variant by default, larger ones from media queries: the browser
+    # downloads one file, once, and caches it (?v= gives a long max-age)
+    widths = sorted(variants)
+    url = lambda w: f"{STATIC_URL}/{VARIANT_DIR}/{variants[w]}?v=1"
+    css = [_rule(url(widths[0]))]
+    for smaller, width in zip(widths, widths[1:]):
+        css.append(f"@media (min-width: {smaller + 1}px) {{ .stApp {{ background-image: url('{url(width)}'); }} }}")
+    return "<style>" + "\n".join(css) + "\n</style>"
+
+
+def inline_css(image_file):
+    encoded = base64.b64encode(encode_variant(image_file, INLINE_WIDTH)).decode()
+    return f"<style>{_rule(f'data:image/webp;base64,{encoded}')}\n</style>"
+
+
+@functools.lru_cache(maxsize=None)
+def background_css(image_file, static=False):
+    # Encoded once per process and image
+    if static:
+        return static_css(build_variants(image_file))
+    return inline_css(image_file)
+
+
+@profiled()
+def add_bg(image_file):
+    static = st.get_option("server.enableStaticServing")
+    st.markdown(background_css(image_file, static), unsafe_allow_html=True)
@@ -0,0 +1,191 @@
+"""Read-only, memory-mapped column store for the city dataset.
+
+A store is a directory of .npy files plus a header.json describing every
+table column (dtype, encoding, file) and precomputed matrix, together with
+the dataset version it was exported from. Readers map the files with
+np.load(mmap_mode="r"), so every worker process shares the same page cache
+instead of holding its own pandas copy.
+
+Export from the repository root with:
+
+    PYTHONPATH=data-science-in-action python -m components.column_store
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from components import data
+
+STORE_DIR = os.path.join(data.DATA_DIR, "store")
+FORMAT = 1
+
+
+def dataset_version(data_dir=data.DATA_DIR):
+    digests = "".join(data.file_digest(os.path.join(data_dir, f)) for f in sorted(data.SOURCES.values()))
+    return hashlib.sha1(f"v{data.SCHEMA_VERSION}:{digests}".encode()).hexdigest()[:16]
+
+
+def _save(directory, stem, array):
+    np.save(os.path.join(directory, stem + ".npy"), np.ascontiguousarray(array), allow_pickle=False)
+    return stem + ".npy"
+
+
+def _write_column(directory, stem, series):
+    # Numbers as-is, categoricals as codes + labels, other text as fixed-width unicode
+    meta = {"name": series.name}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        meta["encoding"] = "category"
+        meta["categories"] = [str(c) for c in series.cat.categories]
+        values = series.cat.codes.to_numpy()
+    elif series.dtype.kind in "biuf":
+        meta["encoding"] = "plain"
+        values = series.to_numpy()
+    else:
+        meta["encoding"] = "unicode"
+        values = series.fillna("").astype(str).to_numpy(dtype=str)
+        nulls = series.isna().to_numpy()
+        if nulls.any():
+            meta["nulls"] = _save(directory, stem + "-nulls", nulls)
+    meta["dtype"] = str(values.dtype)
+    meta["file"] = _save(directory, stem, values)
+    return meta
+
+
+def export_store(root=STORE_DIR, data_dir=data.DATA_DIR, tables=None, matrices=None):
+    # Writes root/<version>/ and then atomically points root/CURRENT at it
+    version = dataset_version(data_dir)
+    if tables is None:
+        tables = {name: data.load_table(name, data_dir) for name in data.SOURCES}
+        tables["merged"] = data.load_merged(data_dir)
+    if matrices is None:
+        matrices = {"lifestyle": lifestyle_matrix(tables["merged"])}
+
+    target = os.path.join(root, version)
+    if os.path.exists(target):
+        # Same sources, same bytes: only the pointer may need updating
+        _point_to(root, version)
+        return target
+    staging = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    header = {"format": FORMAT, "version": version, "tables": {}, "matrices": {}}
+    for t, (name, df) in enumerate(tables.items()):
+        header["tables"][name] = {
+            "n_rows": len(df),
+            "columns": [_write_column(staging, f"t{t}-c{c}", df[col]) for c, col in enumerate(df.columns)],
+        }
+    for m, (name, frame) in enumerate(matrices.items()):
+        header["matrices"][name] = {
+            "file": _save(staging, f"m{m}", frame.to_numpy()),
+            "dtype": str(frame.to_numpy().dtype),
+            "shape": list(frame.shape),
+            "index_name": frame.index.name,
+            "index": [str(i) for i in frame.index],
+            "columns": [str(c) for c in frame.columns],
+        }
+    with open(os.path.join(staging, "header.json"), "w") as f:
+        json.dump(header, f, indent=1)
+
+    os.replace(staging, target)
+    _point_to(root, version)
+    return target
+
+
+def _point_to(root, version):
+    pointer = os.path.join(root, f"CURRENT.{os.getpid()}.tmp")
+    with open(pointer, "w") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(root, "CURRENT"))
+
+
+def lifestyle_matrix(merged):
+    from components.languages import LanguageIndex
+    from components.preferences import build_city_matrix, normalize
+    return normalize(build_city_matrix(merged, languages=LanguageIndex(merged)))
+
+
+class ColumnStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "header.json")) as f:
+            self.header = json.load(f)
+        if self.header["format"] != FORMAT:
+            raise ValueError(f"Unsupported column store format {self.header['format']} in {path}")
+        self.version = self.header["version"]
+
+    def _map(self, file):
+        return np.load(os.path.join(self.path, file), mmap_mode="r")
+
+    def _meta(self, table, name):
+        for meta in self.header["tables"][table]["columns"]:
+            if meta["name"] == name:
+                return meta
+        raise KeyError(f"No column '{name}' in table '{table}'")
+
+    def tables(self):
+        return list(self.header["tables"])
+
+    def columns(self, table):
+        return [meta["name"] for meta in self.header["tables"][table]["columns"]]
+
+    def column(self, table, name):
+        # Zero-copy, read-only array; categoricals come back as their codes
+        return self._map(self._meta(table, name)["file"])
+
+    def series(self, table, name):
+        meta = self._meta(table, name)
+        values = self._map(meta["file"])
+        if meta["encoding"] == "category":
+            values = pd.Categorical.from_codes(values, meta["categories"])
+        elif meta["encoding"] == "unicode":
+            values = values.astype(object)
+            if "nulls" in meta:
+                values[self._map(meta["nulls"])] = np.nan
+        return pd.Series(values, name=name)
+
+    def table(self, name, columns=None):
+        # Materializes a DataFrame; numeric columns wrap the mapped pages
+        columns = columns or self.columns(name)
+        return pd.DataFrame({col: self.series(name, col) for col in columns}, copy=False)
+
+    def matrix(self, name):
+        meta = self.header["matrices"][name]
+        index = pd.Index(meta["index"], name=meta["index_name"])
+        return pd.DataFrame(self._map(meta["file"]), index=index, columns=meta["columns"], copy=False)
+
+
+def open_store(root=STORE_DIR, version=None):
+    # The store root/CURRENT points at, or None when nothing is exported.
+    # Passing version (e.g. dataset_version()) rejects a stale export.
+    try:
+        with open(os.path.join(root, "CURRENT")) as f:
+            current = f.read().strip()
+    except FileNotFoundError:
+        return None
+    if version is not None and current != version:
+        return None
+    return ColumnStore(os.path.join(root, current))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the city CSVs to a memory-mapped column store")
+    parser.add_argument("--root", default=STORE_DIR)
+    parser.add_argument("--data-dir", default=data.DATA_DIR)
+    args = parser.parse_args()
+    path = export_store(args.root, args.data_dir)
+    store = ColumnStore(path)
+    print(f"Exported dataset version {store.version} to {path}")
+    for name in store.tables():
+        print(f"  table {name}: {store.header['tables'][name]['n_rows']} rows, {len(store.columns(name))} columns")
+    for name, meta in store.header["matrices"].items():
+        print(f"  matrix {name}: {tuple(meta['shape'])} {meta['dtype']}")
+
+
+if __name__ == "__main__":
+    main()
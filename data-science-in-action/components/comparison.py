@@ -0,0 +1,137 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from components import data
+from components.highlighter import highlight_better
+from components.profiling import profiled
+
+# Comparison tables: category -> {metric column: row label}, in display order
+CATEGORIES = {
+    "Key Financials 💸": {
+        "Average Monthly Salary": "Average Monthly Salary (€)",
+        "Average Rent Price": "Average Rent Price (€)",
+        "Average Cost of Living": "Average Cost of Living (€)",
+    },
+    "Demographics 👩‍🦳": {
+        "Population Density": "Population Density (People/sq. km)",
+        "Population": "Population (Count)",
+        "Working Age Population": "Working Age Population (Count)",
+        "Youth Dependency Ratio": "Youth Dependency Ratio (%)",
+        "Unemployment Rate": "Unemployment Rate (%)",
+        "GDP per Capita": "GDP per Capita (€)",
+    },
+    "Health Care 💊": {
+        "Health Care Index": "Health Care Index",
+        "Life Expectancy (Years)": "Life Expectancy (Years)",
+    },
+    "Transportation 🚡": {
+        "Traffic Index": "Traffic Index",
+        "Public Transport Satisfaction": "Public Transport Satisfaction",
+    },
+    "Environment 🌱": {
+        "CO2 Emissions (per capita)": "CO2 Emissions (per capita)",
+        "Pollution Index": "Pollution Index",
+        "Air Quality Index": "Air Quality Index",
+        "Green Space Index": "Green Space Index",
+    },
+}
+
+# Where each metric comes from
+SOURCES = {
+    "cities": [col for category in list(CATEGORIES.values())[:2] for col in category],
+    "health": list(CATEGORIES["Health Care 💊"]),
+    "transportation": list(CATEGORIES["Transportation 🚡"]),
+    "environment": list(CATEGORIES["Environment 🌱"]),
+}
+
+# Index values the page has always shown as whole numbers (cut, not rounded)
+WHOLE_NUMBERS = ["Health Care Index", "Life Expectancy (Years)", "CO2 Emissions (per capita)"]
+
+FORMATS = {
+    "Population Density (People/sq. km)": "{:,.0f}",
+    "Population (Count)": "{:,.0f}",
+    "Working Age Population (Count)": "{:,.0f}",
+    "Youth Dependency Ratio (%)": "{:.1f}%",
+    "Unemployment Rate (%)": "{:.1f}%",
+    "GDP per Capita (€)": "€{:,.0f}",
+}
+DEFAULT_FORMAT = "{:.0f}"
+
+
+def _join_key(cities):
+    # health/transportation/environment keep the spaces the city table strips
+    # ("Frankfurt am Main" vs "FrankfurtamMain")
+    return pd.Index(cities.astype(str)).str.replace(" ", "", regex=False)
+
+
+class MetricMatrix:
+    """Every comparison metric of every city in one City-indexed float matrix.
+
+    The four datasets are joined once; comparing any k cities is then a
+    k-row gather instead of a filter per table and rerun. values keeps full
+    precision for computations; frame and tables show the WHOLE_NUMBERS
+    metrics cut, as the page always has.
+    """
+
+    def __init__(self, frame):
+        self.values = frame.to_numpy(dtype=np.float64)
+        whole = frame.columns.intersection(WHOLE_NUMBERS)
+        self.frame = frame.copy()
+        self.frame[whole] = np.trunc(self.frame[whole])
+        self.shown = self.frame.to_numpy(dtype=np.float64)
+        self.cities = frame.index
+        self.columns = {
+            category: frame.columns.get_indexer(list(metrics)) for category, metrics in CATEGORIES.items()
+        }
+
+    @classmethod
+    def build(cls, data_dir=data.DATA_DIR, cache_dir=data.CACHE_DIR):
+        cities = data.load_table("cities", data_dir, cache_dir)
+        frame = pd.DataFrame(
+            cities[SOURCES["cities"]].to_numpy(dtype=np.float64),
+            index=pd.Index(cities["City"].astype(str), name="City"), columns=SOURCES["cities"]
+        )
+        key = _join_key(cities["City"])
+        for name in ("health", "transportation", "environment"):
+            table = data.load_table(name, data_dir, cache_dir)
+            values = table[SOURCES[name]].set_axis(_join_key(table["City"])).astype(np.float64)
+            frame[SOURCES[name]] = values.reindex(key).to_numpy()
+        return cls(frame)
+
+    def positions(self, cities):
+        positions = self.cities.get_indexer(cities)
+        if (positions < 0).any():
+            missing = [c for c, p in zip(cities, positions) if p < 0]
+            raise KeyError(f"Unknown cities: {missing}")
+        return positions
+
+    @profiled("comparison.tables")
+    def tables(self, cities):
+        # {category: metrics x cities frame} for the selected cities, in order
+        cities = list(cities)
+        rows = self.shown[self.positions(cities)]
+        return {
+            category: pd.DataFrame(rows[:, columns].T, index=list(CATEGORIES[category].values()), columns=cities)
+            for category, columns in self.columns.items()
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def _metric_matrix(data_dir, cache_dir):
+    return MetricMatrix.build(data_dir, cache_dir)
+
+
+@profiled()
+def metric_matrix(data_dir=data.DATA_DIR, cache_dir=data.CACHE_DIR):
+    # Built once per process, like the tables it joins
+    return _metric_matrix(data_dir, cache_dir)
+
+
+def styled(table):
+    # Better/worse colouring plus the per-metric number formats
+    styler = table.style.apply(highlight_better, axis=None)
+    for label in table.index:
+        styler = styler.format(FORMATS.get(label, DEFAULT_FORMAT), subset=pd.IndexSlice[[label], :], na_rep="–")
+    return styler
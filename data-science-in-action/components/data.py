@@ -0,0 +1,156 @@
+import functools
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from components.profiling import profiled
+
+DATA_DIR = "data"
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+# Bump when the dtype mapping below changes so stale caches are ignored
+SCHEMA_VERSION = 1
+
+SOURCES = {
+    "cities": "city_data_with_coordinates.csv",
+    "health": "health.csv",
+    "environment": "environment.csv",
+    "transportation": "transportation.csv",
+}
+
+KEY_DTYPES = {"City": "category", "Country": "category"}
+
+# Compact storage types. A column is only narrowed when every value survives
+# the round trip, so larger or more precise feeds fall back to the CSV dtype.
+DTYPES = {
+    "cities": {
+        **KEY_DTYPES,
+        "Population Density": "float32",
+        "Population": "int32",
+        "Working Age Population": "float32",
+        "Days of Very Strong Heat Stress": "int8",
+        "Main Spoken Languages": "category",
+        "Average Monthly Salary": "int16",
+        "Average Rent Price": "int16",
+        "Average Cost of Living": "int16",
+        "Days since update": "int16",
+        "Affordability": "int16",
+    },
+    "health": {**KEY_DTYPES},
+    "environment": {
+        **KEY_DTYPES,
+        "Pollution Index": "int8",
+        "Air Quality Index": "int8",
+        "Green Space Index": "int8",
+    },
+    "transportation": {
+        **KEY_DTYPES,
+        "Traffic Index": "int8",
+        "Public Transport Satisfaction": "int8",
+    },
+}
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path, size, mtime_ns):
+    # size/mtime only key the memo; the cache key itself is the content hash
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _narrow(series, dtype):
+    if dtype == "category":
+        # Categories in first-appearance order: hashing only, no string sort
+        codes, categories = pd.factorize(series, sort=False)
+        return pd.Series(pd.Categorical.from_codes(codes, categories), index=series.index, name=series.name)
+    dtype = np.dtype(dtype)
+    values = series.to_numpy(np.float64)
+    if dtype.kind == "i" and len(values):
+        info = np.iinfo(dtype)
+        if np.isnan(values).any() or values.min() < info.min or values.max() > info.max:
+            return series
+    narrowed = values.astype(dtype)
+    if not np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+        return series
+    return pd.Series(narrowed, index=series.index, name=series.name)
+
+
+def compact(df, dtypes):
+    df = df.copy()
+    for col, dtype in dtypes.items():
+        if col in df.columns:
+            df[col] = _narrow(df[col], dtype)
+    return df
+
+
+def _cached(key, build, cache_dir):
+    # Parquet keeps categoricals and narrow ints, so a warm start is one read
+    path = os.path.join(cache_dir, f"{key}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    df = build()
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return df
+
+
+@functools.lru_cache(maxsize=None)
+def _load_table(name, data_dir, cache_dir):
+    path = os.path.join(data_dir, SOURCES[name])
+    key = f"{name}-v{SCHEMA_VERSION}-{file_digest(path)[:16]}"
+    return _cached(key, lambda: compact(pd.read_csv(path), DTYPES[name]), cache_dir)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_merged(data_dir, cache_dir):
+    digests = "".join(file_digest(os.path.join(data_dir, SOURCES[n])) for n in ("cities", "health", "environment"))
+    key = f"merged-v{SCHEMA_VERSION}-{hashlib.sha1(digests.encode()).hexdigest()[:16]}"
+
+    def build():
+        merged = load_table("cities", data_dir, cache_dir)
+        for name in ("health", "environment"):
+            merged = merged.merge(load_table(name, data_dir, cache_dir), on=["City", "Country"])
+        return compact(merged, KEY_DTYPES)
+
+    return _cached(key, build, cache_dir)
+
+
+@profiled()
+def load_table(name, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    # Parsed once per process; callers get a shallow copy so dropping or
+    # adding columns never leaks into the shared frame
+    return _load_table(name, data_dir, cache_dir).copy(deep=False)
+
+
+def load_cities(**kwargs):
+    return load_table("cities", **kwargs)
+
+
+def load_health(**kwargs):
+    return load_table("health", **kwargs)
+
+
+def load_environment(**kwargs):
+    return load_table("environment", **kwargs)
+
+
+def load_transportation(**kwargs):
+    return load_table("transportation", **kwargs)
+
+
+@profiled()
+def load_merged(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    # Cities joined with health and environment, as the lifestyle matcher needs
+    return _load_merged(data_dir, cache_dir).copy(deep=False)
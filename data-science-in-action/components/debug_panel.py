@@ -0,0 +1,23 @@
+import streamlit as st
+from components import profiling
+
+def profile_page(page):
+    # Call first thing on a page. Profiling is process-wide and its buffer
+    # holds every session's records, so only the server's WSIL_PROFILE
+    # switches it, never a visitor's URL.
+    return profiling.start_run(page)
+
+def debug_panel():
+    # Call last thing on a page: this rerun's stages, and exports of them
+    if not profiling.is_enabled():
+        return
+    run = profiling.current_run()
+    df = profiling.records(run)
+    with st.sidebar.expander("⏱️ Profiling", expanded=False):
+        st.caption(f"Run {run}: {profiling.run_elapsed() * 1000:.1f} ms so far, {len(df)} timed calls")
+        if len(df):
+            st.dataframe(profiling.summary(df).style.format({"total_s": "{:.4f}", "max_s": "{:.4f}"}))
+        st.download_button("Export JSON", profiling.export_json(run=run), "profile.json", "application/json")
+        st.download_button("Export CSV", profiling.export_csv(run=run), "profile.csv", "text/csv")
+        if st.button("Clear buffer"):
+            profiling.clear()
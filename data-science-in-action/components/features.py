@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from components.languages import speaks
+
+# Lifestyle dimensions, in the same order as components.preferences.PARAMS
+FEATURES = [
+    "cost", "climate", "green", "nightlife",
+    "job_market", "safety", "international",
+    "walkability", "culture",
+    "health", "air_quality"
+]
+
+# Raw columns the feature expressions read from the merged city table
+SOURCE_COLUMNS = [
+    "Average Rent Price", "Average Cost of Living",
+    "Days of Very Strong Heat Stress", "Green Space Index",
+    "Population Density", "Youth Dependency Ratio",
+    "GDP per Capita", "Unemployment Rate", "Main Spoken Languages",
+    "Health Care Index", "Life Expectancy (Years)",
+    "Air Quality Index", "CO2 Emissions (per capita)"
+]
+
+
+def _col(df, name):
+    return df[name].to_numpy(dtype=np.float64)
+
+
+def english_mask(df, languages=None):
+    # With a LanguageIndex over df this is a lookup; otherwise the same token
+    # match on the raw text, as build_city_vector does
+    if languages is not None:
+        return languages.mask("English")
+    return np.array([speaks(s, "English") for s in df["Main Spoken Languages"]], dtype=bool)
+
+
+def feature_arrays(df, languages=None):
+    rent = _col(df, "Average Rent Price")
+    living = _col(df, "Average Cost of Living")
+    density = _col(df, "Population Density")
+    gdp = _col(df, "GDP per Capita")
+    unemployment = _col(df, "Unemployment Rate")
+    log_density = np.log1p(density)
+
+    international = english_mask(df, languages).astype(np.float64)
+    international += np.where(gdp > 40000, 0.5, 0.0)
+
+    return {
+        "cost": -(rent + living) / 2,
+        "climate": -_col(df, "Days of Very Strong Heat Stress"),
+        "green": _col(df, "Green Space Index"),
+        "nightlife": log_density + (_col(df, "Youth Dependency Ratio") * 0.5),
+        "job_market": gdp - (unemployment * 500),
+        "safety": gdp - (unemployment * 200),
+        "international": international,
+        "walkability": np.sqrt(density),
+        "culture": log_density + (gdp / 10000),
+        "health": _col(df, "Health Care Index") + (_col(df, "Life Expectancy (Years)") * 0.5),
+        "air_quality": _col(df, "Air Quality Index") - (_col(df, "CO2 Emissions (per capita)") * 2),
+    }
+
+
+def feature_matrix(df, languages=None):
+    # (n_cities, 11) float64 matrix, columns ordered as FEATURES
+    arrays = feature_arrays(df, languages)
+    out = np.empty((len(df), len(FEATURES)), dtype=np.float64)
+    for j, name in enumerate(FEATURES):
+        out[:, j] = arrays[name]
+    return out
+
+
+def minmax_normalize(matrix, out=None):
+    # Column-wise min-max scaling in one pass; constant columns become 0
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(matrix)
+    lo = np.nanmin(matrix, axis=0) if len(matrix) else np.zeros(matrix.shape[1])
+    span = (np.nanmax(matrix, axis=0) if len(matrix) else lo) - lo
+    flat = span == 0
+    np.subtract(matrix, lo, out=out)
+    np.divide(out, np.where(flat, 1.0, span), out=out)
+    out[:, flat] = 0
+    return out
+
+
+def city_feature_frame(df, normalized=True, languages=None):
+    matrix = feature_matrix(df, languages)
+    if normalized:
+        minmax_normalize(matrix, out=matrix)
+    return pd.DataFrame(matrix, index=pd.Index(df["City"], name="City"), columns=FEATURES)
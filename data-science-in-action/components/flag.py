@@ -1,22 +1,100 @@
-import pycountry
-import streamlit as st
+import functools
+import os
+import re
+
+import pandas as pd
+import requests
+
+from components.data import CACHE_DIR, DATA_DIR
+from components.profiling import profiled
+
+FLAGS_FILE = "country_flags.csv"
+FLAG_URL = "https://flagcdn.com/h60/{code}.png"
+FLAG_CACHE_DIR = os.path.join(CACHE_DIR, "flags")
+
+
+def split_name(name):
+    # The dataset strips spaces from country names: "UnitedKingdom" -> "United Kingdom"
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", name.strip())
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_code(name):
+    # Slow path: exact ISO lookup (names, official names, codes), then fuzzy search.
+    # pycountry is only imported here, so a warm table never loads it.
+    import pycountry
+
+    for candidate in dict.fromkeys([name, split_name(name)]):
+        try:
+            return pycountry.countries.lookup(candidate).alpha_2.lower()
+        except LookupError:
+            pass
+        try:
+            return pycountry.countries.search_fuzzy(candidate)[0].alpha_2.lower()
+        except LookupError:
+            pass
+    return None
 
-def get_iso_code(name):
-    try:
-        return pycountry.countries.get(name=name).alpha_2.lower()
-    except:
-        return None
 
-import pycountry
+def flag_table(countries):
+    # Country -> ISO code and flag URL, built once per dataset by the pipeline
+    names = pd.Series(pd.unique(pd.Series(countries).dropna().astype(str)), name="Country")
+    codes = names.map(resolve_code)
+    return pd.DataFrame({
+        "Country": names,
+        "ISO": codes,
+        "Flag URL": codes.map(lambda code: FLAG_URL.format(code=code), na_action="ignore"),
+    })
 
-def flag_from_country(name):
+
+def load_flags(data_dir=DATA_DIR):
+    # A missing table is not remembered, and the memo is keyed on the file's
+    # mtime, so a table the pipeline writes later is used without a restart
+    path = os.path.join(data_dir, FLAGS_FILE)
     try:
-        if name != 'UnitedKingdom':
-            match = pycountry.countries.search_fuzzy(name)[0]
-            code = match.alpha_2.lower()
-            return f"https://flagcdn.com/h60/{code}.png"
-        else:
-            return f"https://flagcdn.com/h60/gb.png"
-    except:
-        return None
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    return _load_flags(path, stat.st_mtime_ns)
+
 
+@functools.lru_cache(maxsize=8)
+def _load_flags(path, mtime_ns):
+    table = pd.read_csv(path, keep_default_na=False)
+    return dict(zip(table["Country"], table["ISO"]))
+
+
+def get_iso_code(name):
+    code = load_flags().get(name) or resolve_code(name)
+    return code or None
+
+
+def download_flags(codes, cache_dir=FLAG_CACHE_DIR, session=None, timeout=10):
+    # Fetch the flag PNGs once so the pages can serve them from disk
+    session = session or requests.Session()
+    os.makedirs(cache_dir, exist_ok=True)
+    fetched = []
+    for code in sorted(set(codes)):
+        path = os.path.join(cache_dir, f"{code}.png")
+        if os.path.exists(path):
+            continue
+        response = session.get(FLAG_URL.format(code=code), timeout=timeout)
+        response.raise_for_status()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp, path)
+        fetched.append(code)
+    return fetched
+
+
+@profiled()
+def flag_from_country(name, cache_dir=FLAG_CACHE_DIR):
+    # A local PNG when the flags have been downloaded, else the CDN URL
+    code = get_iso_code(name)
+    if code is None:
+        return None
+    path = os.path.join(cache_dir, f"{code}.png")
+    if os.path.exists(path):
+        return path
+    return FLAG_URL.format(code=code)
@@ -0,0 +1,126 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+LAT_COLUMN = "Latitude"
+LON_COLUMN = "Longitude"
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    # Great-circle distance in km; any argument may be an array (degrees)
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    """Grid of latitude/longitude cells over a city table's coordinates.
+
+    Rows are sorted by cell id, so the cells a query circle overlaps are a
+    few contiguous slices per latitude row (binary searches), and exact
+    haversine distances are only computed for the points in them. Queries
+    return row positions into the indexed frame; rows without coordinates
+    never match.
+    """
+
+    # Average points per occupied cell the automatic cell size aims for
+    POINTS_PER_CELL = 32
+    # Below this share of rows, filtering positions directly beats a grid query
+    DIRECT_FRACTION = 1 / 16
+    # Above this share of rows in the overlapped cells, one full scan is cheaper
+    SCAN_FRACTION = 1 / 2
+
+    def __init__(self, df, lat=LAT_COLUMN, lon=LON_COLUMN, cell_deg=None):
+        self.n_rows = len(df)
+        self.lat = df[lat].to_numpy(dtype=np.float64)
+        self.lon = df[lon].to_numpy(dtype=np.float64)
+        valid = np.flatnonzero(~(np.isnan(self.lat) | np.isnan(self.lon)))
+        if cell_deg is None:
+            cell_deg = self.auto_cell(self.lat[valid], self.lon[valid])
+        self.cell_deg = float(cell_deg)
+        # Longitude cells tile the full circle exactly (no narrower last cell
+        # at the antimeridian), so they are at most cell_deg wide
+        self.n_lon = int(np.ceil(360 / self.cell_deg))
+        self.cell_deg_lon = 360 / self.n_lon
+        cells = self.cells(self.lat[valid], self.lon[valid])
+        order = np.argsort(cells, kind="stable")
+        self.ids = cells[order]
+        self.rows = valid[order]
+
+    @classmethod
+    def auto_cell(cls, lat, lon):
+        # Cell edge (degrees) giving ~POINTS_PER_CELL points per cell over the bounding box
+        if len(lat) == 0:
+            return 1.0
+        area = max(np.ptp(lat), 1e-3) * max(np.ptp(lon), 1e-3)
+        return float(np.clip(np.sqrt(area * cls.POINTS_PER_CELL / len(lat)), 0.01, 10.0))
+
+    def _lat_bin(self, lat):
+        return np.minimum(np.floor((np.asarray(lat) + 90) / self.cell_deg), np.ceil(180 / self.cell_deg) - 1).astype(np.int64)
+
+    def _lon_bin(self, lon):
+        return (np.floor((np.asarray(lon) + 180) / self.cell_deg_lon).astype(np.int64)) % self.n_lon
+
+    def cells(self, lat, lon):
+        return self._lat_bin(lat) * self.n_lon + self._lon_bin(lon)
+
+    def candidates(self, lat, lon, radius_km):
+        # Rows in the cells that a circle of radius_km around (lat, lon) overlaps,
+        # or None when that is most rows and a full scan is cheaper
+        theta = np.degrees(radius_km / EARTH_RADIUS_KM)
+        lat_lo, lat_hi = lat - theta, lat + theta
+        if lat_lo <= -90 or lat_hi >= 90 or theta >= 90 - abs(lat):
+            dlon = 180.0
+        else:
+            # Widest longitude extent of a spherical cap
+            dlon = np.degrees(np.arcsin(np.sin(np.radians(theta)) / np.cos(np.radians(lat))))
+        rows = np.arange(self._lat_bin(max(lat_lo, -90)), self._lat_bin(min(lat_hi, 90)) + 1)
+        if dlon >= 180 or 2 * dlon >= 360 - self.cell_deg_lon:
+            spans = [(0, self.n_lon - 1)]
+        else:
+            lo, hi = self._lon_bin(lon - dlon), self._lon_bin(lon + dlon)
+            spans = [(lo, hi)] if lo <= hi else [(0, hi), (lo, self.n_lon - 1)]
+        starts, ends = [], []
+        for lo, hi in spans:
+            starts.append(np.searchsorted(self.ids, rows * self.n_lon + lo, side="left"))
+            ends.append(np.searchsorted(self.ids, rows * self.n_lon + hi, side="right"))
+        starts, ends = np.concatenate(starts), np.concatenate(ends)
+        if (ends - starts).sum() > len(self.rows) * self.SCAN_FRACTION:
+            return None
+        return np.concatenate([self.rows[s:e] for s, e in zip(starts, ends)] or [np.empty(0, dtype=np.intp)])
+
+    def distances(self, lat, lon, positions=None):
+        if positions is None:
+            return haversine(lat, lon, self.lat, self.lon)
+        return haversine(lat, lon, self.lat[positions], self.lon[positions])
+
+    def within(self, lat, lon, radius_km):
+        # Ascending row positions within radius_km of (lat, lon)
+        rows = self.candidates(lat, lon, radius_km)
+        if rows is None:
+            return np.flatnonzero(self.distances(lat, lon) <= radius_km)
+        return np.sort(rows[self.distances(lat, lon, rows) <= radius_km])
+
+    def filter(self, positions, lat, lon, radius_km):
+        # Keep the positions (ascending) within radius_km of (lat, lon)
+        positions = np.asarray(positions, dtype=np.intp)
+        if len(positions) <= self.n_rows * self.DIRECT_FRACTION:
+            return positions[self.distances(lat, lon, positions) <= radius_km]
+        return np.intersect1d(positions, self.within(lat, lon, radius_km), assume_unique=True)
+
+    def nearest(self, lat, lon, n, positions=None):
+        # (positions, km) of the n rows closest to (lat, lon), nearest first;
+        # restricted to `positions` when given. Ties keep row order.
+        if positions is not None:
+            rows = np.asarray(positions, dtype=np.intp)
+            rows = rows[~np.isnan(self.lat[rows]) & ~np.isnan(self.lon[rows])]
+        else:
+            # Widen the circle until it holds n rows: those are then the n nearest
+            radius = self.cell_deg * 111.0
+            while True:
+                rows = self.within(lat, lon, radius)
+                if len(rows) >= n or radius >= np.pi * EARTH_RADIUS_KM:
+                    break
+                radius *= 2
+        km = self.distances(lat, lon, rows)
+        order = np.argsort(km, kind="stable")[:n]
+        return rows[order], km[order]
@@ -1,40 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from components.profiling import profiled
+
+BETTER = "background-color: lightgreen"
+WORSE = "background-color: lightcoral"
+
+# Metrics where the largest value wins; every other metric is better when lower
+HIGHER_IS_BETTER = frozenset([
+    'Average Monthly Salary (€)',
+    'GDP per Capita (€)',
+    'Working Age Population (Count)',
+    'Air Quality Index',
+    'Green Space Index',
+    'Health Care Index',
+    'Life Expectancy (Years)',
+    'Public Transport Satisfaction',
+])
+
+AIR_QUALITY_COLORS = {
+    'good': 'background-color: darkgreen',
+    'fair': 'background-color: green',
+    'moderate': 'background-color: yellow',
+    'poor': 'background-color: red',
+    'very poor': 'background-color: purple',
+}
+NO_COLOR = 'background-color: transparent'
+
+
+def directions(metrics):
+    # +1 where higher is better, -1 where lower is better
+    return np.where(pd.Index(metrics).isin(list(HIGHER_IS_BETTER)), 1.0, -1.0)
+
+
+def better_mask(table):
+    # Metrics x cities table -> True where a city has the best value of its metric
+    values = table.to_numpy(dtype=np.float64) * directions(table.index)[:, None]
+    missing = np.isnan(values)
+    values[missing] = -np.inf
+    return (values == values.max(axis=1, keepdims=True)) & ~missing
+
+
+@profiled()
+def highlight_better(table):
+    # For Styler.apply(..., axis=None): all cells of any number of cities at once
+    styles = np.where(better_mask(table), BETTER, WORSE)
+    return pd.DataFrame(styles, index=table.index, columns=table.columns)
+
+
 def highlight_better_row(row):
-    new_row = []
-    for i, val in enumerate(row):
-        metric_name = row.name
-
-        higher_is_better = [
-            'Average Monthly Salary (€)',
-            'GDP per Capita (€)',
-            'Working Age Population (Count)',
-            'Air Quality Index',
-            'Green Space Index',
-            'Health Care Index',
-            'Life Expectancy (Years)',
-            'Public Transport Satisfaction'
-        ]
-
-        if metric_name in higher_is_better:
-            color = "background-color: lightgreen" if val == row.max() else "background-color: lightcoral"
-        else:
-            color = "background-color: lightgreen" if val == row.min() else "background-color: lightcoral"
-        new_row.append(color)
-    return new_row
-
-def air_pollution(row):
-    new_row = []
-    for val in row:
-        if val == 'good':
-            color = 'background-color: darkgreen'
-        elif val == 'fair':
-            color = 'background-color: green'
-        elif val == 'moderate':
-            color = 'background-color: yellow'
-        elif val == 'poor':
-            color = 'background-color: red'
-        elif val == 'very poor':
-            color = 'background-color: purple'
-        else:
-            color = 'background-color: transparent'
-        new_row.append(color)
-    return new_row
+    return highlight_better(row.to_frame().T).iloc[0].tolist()
+
+
+def air_pollution(data):
+    values = np.asarray(data, dtype=object)
+    styles = pd.Series(AIR_QUALITY_COLORS).reindex(values.ravel()).fillna(NO_COLOR).to_numpy()
+    styles = styles.reshape(values.shape)
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(styles, index=data.index, columns=data.columns)
+    return styles.tolist()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+LANGUAGE_COLUMN = "Main Spoken Languages"
+
+
+def canonical(language):
+    return language.strip().casefold()
+
+
+def speaks(spoken, language):
+    # Whether one comma-separated "Main Spoken Languages" value lists language:
+    # the same trimmed, case-folded token match as LanguageIndex
+    if not isinstance(spoken, str):
+        return False
+    return canonical(language) in {canonical(s) for s in spoken.split(",")}
+
+
+class LanguageIndex:
+    """Inverted index from spoken language to the row positions of a city table.
+
+    Built once from the comma-separated "Main Spoken Languages" column; every
+    lookup afterwards is a dict hit returning a sorted position array.
+    """
+
+    def __init__(self, df, column=LANGUAGE_COLUMN):
+        self.n_rows = len(df)
+        spoken = df[column].reset_index(drop=True).dropna().astype(str)
+        tokens = spoken.str.split(",").explode().str.strip()
+        tokens = tokens[tokens != ""]
+        pairs = pd.DataFrame({
+            "name": tokens.to_numpy(),
+            "key": tokens.str.casefold().to_numpy(),
+            "row": tokens.index.to_numpy(dtype=np.intp),
+        }).drop_duplicates(subset=["key", "row"])
+
+        codes, keys = pd.factorize(pairs["key"])
+        _, first = np.unique(codes, return_index=True)
+        # Display names keep the spelling and first-appearance order of the data
+        self.languages = pairs["name"].iloc[first].tolist()
+
+        order = np.lexsort((pairs["row"].to_numpy(), codes))
+        offsets = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+        rows = pairs["row"].to_numpy()[order]
+        self._rows = {key: rows[offsets[i]:offsets[i + 1]] for i, key in enumerate(keys)}
+
+    def options(self):
+        return list(self.languages)
+
+    def rows(self, language):
+        return self._rows.get(canonical(language), np.empty(0, dtype=np.intp))
+
+    def mask(self, language):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.rows(language)] = True
+        return mask
+
+    def any_of(self, languages):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for language in languages:
+            mask[self.rows(language)] = True
+        return np.flatnonzero(mask)
+
+    def all_of(self, languages):
+        languages = sorted(languages, key=lambda lang: len(self.rows(lang)))
+        if not languages:
+            return np.arange(self.n_rows)
+        result = self.rows(languages[0])
+        for language in languages[1:]:
+            result = np.intersect1d(result, self.rows(language), assume_unique=True)
+        return result
+
+    def filter(self, positions, language):
+        # Keep the positions (ascending) of cities where language is spoken
+        return np.intersect1d(positions, self.rows(language), assume_unique=True)
@@ -1,36 +1,70 @@
 import numpy as np
 import pandas as pd
+from components.ranking import SCORE_WEIGHTS
+from components.geo_index import haversine, LAT_COLUMN, LON_COLUMN
+from components.languages import speaks
+from components.profiling import profiled
 
-def find_matching(df, user_language, pref):
+@profiled()
+def match_positions(df, user_language, pref, index=None, languages=None, geo=None, near=None):
 
-    constraints = (
-        (df["Average Rent Price"] <= pref["Average Rent Price"]) &
-        (df["Average Cost of Living"] <= pref["Average Cost of Living"]) &
-        (df["Average Monthly Salary"] >= pref["Average Monthly Salary"])
-    )
+    if index is not None:
+        # RangeIndex built on df: binary search instead of full-column masks
+        positions = index.positions(pref)
+    else:
+        constraints = (
+            (df["Average Rent Price"] <= pref["Average Rent Price"]) &
+            (df["Average Cost of Living"] <= pref["Average Cost of Living"]) &
+            (df["Average Monthly Salary"] >= pref["Average Monthly Salary"])
+        )
+        positions = np.flatnonzero(constraints.to_numpy())
+
+    if user_language != "Any" and languages is not None:
+        # LanguageIndex built on df: intersect row positions, no string parsing
+        positions = languages.filter(positions, user_language)
+    elif user_language != "Any" and len(positions):
+        spoken = [speaks(s, user_language) for s in df["Main Spoken Languages"].take(positions)]
+        positions = positions[np.array(spoken, dtype=bool)]
+
+    if near is not None:
+        # (latitude, longitude, radius in km) around e.g. the user's current home
+        lat, lon, radius_km = near
+        if geo is not None:
+            # GeoIndex built on df: grid cells instead of every distance
+            positions = geo.filter(positions, lat, lon, radius_km)
+        else:
+            distances = haversine(
+                lat, lon,
+                df[LAT_COLUMN].to_numpy(dtype=np.float64)[positions],
+                df[LON_COLUMN].to_numpy(dtype=np.float64)[positions],
+            )
+            positions = positions[distances <= radius_km]
+
+    return positions
+
+@profiled()
+def rank_matching(df, user_language, pref, ranker, index=None, languages=None, weights=None, geo=None, near=None):
+    # Lazily ordered matches: use .top(n) / .page(i, size) to materialize rows
+    positions = match_positions(df, user_language, pref, index=index, languages=languages, geo=geo, near=near)
+    return ranker.rank(positions, weights)
 
-    filtered = df[constraints].copy()
+@profiled()
+def find_matching(df, user_language, pref, index=None, languages=None, ranker=None, weights=None, geo=None, near=None):
+
+    if ranker is not None:
+        # PercentileRanker built on df: subset ranks from precomputed sort orders
+        return rank_matching(df, user_language, pref, ranker, index, languages, weights, geo, near).frame(df)
+
+    filtered = df.take(match_positions(df, user_language, pref, index=index, languages=languages, geo=geo, near=near))
 
     if not filtered.empty:
-        if user_language != "Any":
-            filtered = filtered[
-                filtered["Main Spoken Languages"]
-                .astype(str)
-                .str.split(",")
-                .apply(lambda x: user_language in [s.strip() for s in x])
-        ]
-        
-        filtered["score"] = (
-            filtered["GDP per Capita"].rank(pct=True) +
-            filtered["Average Monthly Salary"].rank(pct=True) -
-            filtered["Unemployment Rate"].rank(pct=True)
+        weights = SCORE_WEIGHTS if weights is None else weights
+        filtered["score"] = sum(
+            weight * filtered[col].rank(pct=True) for col, weight in weights.items()
         )
 
-        filtered  = filtered.sort_values("score", ascending=False)
+        filtered  = filtered.sort_values("score", ascending=False, kind="stable")
 
     if "score" in filtered.columns:
         return filtered.drop(columns="score")
     return filtered
-
-
-
@@ -0,0 +1,234 @@
+import bisect
+
+import numpy as np
+
+from components.comparison import CATEGORIES
+from components.highlighter import directions
+from components.profiling import profiled
+
+# Metrics a front can be computed over: column -> label, as in the comparison tables
+OBJECTIVES = {col: label for metrics in CATEGORIES.values() for col, label in metrics.items()}
+DEFAULT_OBJECTIVES = ["Average Cost of Living", "Average Monthly Salary", "Air Quality Index"]
+
+# Points tested against the window at once by the block-nested-loop skyline
+BLOCK_SIZE = 1024
+# Window points per bitmap chunk (a multiple of 64)
+CHUNK_SIZE = 512
+# Points (low normalized cost sums) that screen out dominated rows before the exact pass
+FILTER_POINTS = 32
+
+
+def _unique_sorted(points):
+    # Lexicographically sorted distinct rows, and each input row's index into them
+    points = points + 0.0  # -0.0 -> 0.0
+    order = np.lexsort(points.T[::-1])
+    ordered = points[order]
+    new = np.ones(len(points), dtype=bool)
+    new[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    inverse = np.empty(len(points), dtype=np.intp)
+    inverse[order] = np.cumsum(new) - 1
+    return ordered[new], inverse
+
+
+def _screen(points, k=FILTER_POINTS):
+    # Mask of the rows not dominated by k screening points, each the lowest
+    # range-normalized cost sum among the rows still left, so later ones come
+    # from regions the earlier ones did not cover. Dropping dominated rows
+    # never changes the skyline of the rest, and costs only O(k n).
+    columns = np.ascontiguousarray(points.T)
+    score = np.zeros(len(points))
+    for column in columns:
+        span = column.max() - column.min()
+        score += (column - column.min()) / (span if span > 0 else 1)
+    rows = np.arange(len(points))
+    alive = np.ones(len(points), dtype=bool)
+    for _ in range(min(k, len(points))):
+        best = np.argmin(score)
+        if score[best] == np.inf:
+            break
+        weakly = np.ones(len(rows), dtype=bool)
+        strictly = np.zeros(len(rows), dtype=bool)
+        for column in columns:
+            weakly &= column[best] <= column
+            strictly |= column[best] < column
+        dominated = weakly & strictly
+        alive &= ~dominated
+        # A screening point survives itself, but is not picked again
+        score[dominated] = np.inf
+        score[best] = np.inf
+        if alive.sum() < len(rows) * 3 // 4:
+            rows, columns, score, alive = rows[alive], columns[:, alive], score[alive], alive[alive]
+    rows = rows[alive]
+    keep = np.zeros(len(points), dtype=bool)
+    keep[rows] = True
+    return keep
+
+
+def _skyline_2d(points):
+    # Distinct points in (x, y) order: a point is dominated iff an earlier one has y <= its y
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.minimum.accumulate(points[:-1, 1]) > points[1:, 1]
+    return keep
+
+
+def _skyline_3d(points):
+    # Distinct points in (x, y, z) order, swept in x with a (y, z) staircase of
+    # the front so far: y ascending, z descending. A point is dominated iff the
+    # staircase step at or left of its y is not above its z.
+    keep = np.zeros(len(points), dtype=bool)
+    ys, zs = [], []
+    for i, (_, y, z) in enumerate(points.tolist()):
+        k = bisect.bisect_right(ys, y)
+        if k and zs[k - 1] <= z:
+            continue
+        keep[i] = True
+        # Steps the new point covers (y >= its y, z >= its z) are dropped
+        lo = bisect.bisect_left(ys, y)
+        hi = lo
+        while hi < len(ys) and zs[hi] >= z:
+            hi += 1
+        ys[lo:hi] = [y]
+        zs[lo:hi] = [z]
+    return keep
+
+
+def _covers(a, b):
+    # (len(a), len(b)) mask of a[i] <= b[j] in every objective, one objective
+    # at a time (much faster than reducing over a short last axis)
+    covers = a[:, None, 0] <= b[None, :, 0]
+    for j in range(1, a.shape[1]):
+        covers &= a[:, None, j] <= b[None, :, j]
+    return covers
+
+
+def _bitmaps(window):
+    # Per objective: the window's values sorted, and for each rank the bitmap
+    # (uint64 words) of the window points whose value is at or below it
+    lower = np.tri(len(window), dtype=bool)
+    maps = []
+    for column in window.T:
+        order = np.argsort(column, kind="stable")
+        bits = np.empty_like(lower)
+        bits[:, order] = lower
+        maps.append((column[order], np.packbits(bits, axis=1).view(np.uint64)))
+    return maps
+
+
+def _dominated_by(maps, points):
+    # A point is dominated by the chunk iff some window point is <= it in
+    # every objective: the AND of one prefix bitmap per objective is not empty
+    dominated = np.ones(len(points), dtype=bool)
+    common = None
+    for (values, prefix), column in zip(maps, points.T):
+        below = np.searchsorted(values, column, side="right")
+        dominated &= below > 0
+        bits = prefix[np.maximum(below - 1, 0)]
+        common = bits if common is None else common & bits
+    return dominated & common.any(axis=1)
+
+
+def _skyline_bnl(points):
+    # Block-nested loop over distinct points presorted by coordinate sum (ties
+    # lexicographically), so a dominating point always comes first and the
+    # window of front points only grows. Full chunks of the window are
+    # queried through per-objective bitmaps, the rest compared directly.
+    order = np.lexsort(np.vstack([points.T[::-1], points.sum(axis=1)]))
+    ordered = points[order]
+    keep = np.zeros(len(points), dtype=bool)
+    chunks = []
+    tail = np.empty((0, points.shape[1]))
+    for start in range(0, len(ordered), BLOCK_SIZE):
+        block = ordered[start:start + BLOCK_SIZE]
+        rest = np.arange(len(block))
+        for maps in chunks:
+            rest = rest[~_dominated_by(maps, block[rest])]
+        if len(tail):
+            rest = rest[~_covers(tail, block[rest]).any(axis=0)]
+        # Within the block only earlier points can dominate later ones
+        rest = rest[~np.triu(_covers(block[rest], block[rest]), k=1).any(axis=0)]
+        keep[order[start + rest]] = True
+        tail = np.vstack([tail, block[rest]])
+        while len(tail) >= CHUNK_SIZE:
+            chunks.append(_bitmaps(tail[:CHUNK_SIZE]))
+            tail = tail[CHUNK_SIZE:]
+    return keep
+
+
+@profiled()
+def skyline(points):
+    # Mask of the rows no other row dominates, every column minimized
+    # (<= everywhere and < somewhere). Equal rows share the outcome; rows
+    # with NaN are never on it.
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 1:
+        points = points[:, None]
+    keep = np.zeros(len(points), dtype=bool)
+    rows = np.flatnonzero(~np.isnan(points).any(axis=1))
+    if not len(rows):
+        return keep
+    d = points.shape[1]
+    if d > 1:
+        rows = rows[_screen(points[rows])]
+    distinct, inverse = _unique_sorted(points[rows])
+    if d == 1:
+        front = np.arange(len(distinct)) == 0
+    elif d == 2:
+        front = _skyline_2d(distinct)
+    elif d == 3:
+        front = _skyline_3d(distinct)
+    else:
+        front = _skyline_bnl(distinct)
+    keep[rows] = front[inverse]
+    return keep
+
+
+@profiled()
+def pareto_fronts(points, max_fronts=None):
+    # Front number of every row (0 = non-dominated, 1 = non-dominated once
+    # front 0 is removed, ...); -1 for rows with NaN or past max_fronts
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 1:
+        points = points[:, None]
+    fronts = np.full(len(points), -1, dtype=np.intp)
+    remaining = np.flatnonzero(~np.isnan(points).any(axis=1))
+    front = 0
+    while len(remaining) and (max_fronts is None or front < max_fronts):
+        keep = skyline(points[remaining])
+        fronts[remaining[keep]] = front
+        remaining = remaining[~keep]
+        front += 1
+    return fronts
+
+
+class ParetoEngine:
+    """Successive Pareto fronts of any subset of cities over chosen metrics.
+
+    Works on a MetricMatrix, whose rows are the city table's rows, so the
+    positions from match_positions can be passed straight in. Every metric
+    is turned into a cost (negated where higher is better) once, from the
+    full-precision values rather than the ones shown in the tables.
+    """
+
+    def __init__(self, matrix):
+        columns = list(matrix.frame.columns)
+        self.costs = matrix.values * -directions([OBJECTIVES.get(c, c) for c in columns])
+        self.columns = {col: i for i, col in enumerate(columns)}
+        self.n_rows = len(self.costs)
+
+    def points(self, objectives, positions=None):
+        columns = [self.columns[col] for col in objectives]
+        if positions is None:
+            return self.costs[:, columns]
+        return self.costs[np.asarray(positions, dtype=np.intp)][:, columns]
+
+    @profiled("pareto.fronts")
+    def fronts(self, objectives, positions=None, max_fronts=None):
+        # (positions, front numbers) ordered by front, then row; rows past
+        # max_fronts or missing a metric are left out
+        if positions is None:
+            positions = np.arange(self.n_rows)
+        positions = np.asarray(positions, dtype=np.intp)
+        fronts = pareto_fronts(self.points(objectives, positions), max_fronts)
+        order = np.lexsort((positions, fronts))
+        order = order[fronts[order] >= 0]
+        return positions[order], fronts[order]
@@ -1,5 +1,9 @@
 import pandas as pd
 import numpy as np
+from components.features import city_feature_frame, minmax_normalize
+from components.languages import speaks
+from components.scoring import CityScorer
+from components.profiling import profiled
 
 PARAMS = [
     "cost", "climate", "green", "nightlife",
@@ -8,6 +12,7 @@ PARAMS = [
     "health", "air_quality"
 ]
 
+@profiled()
 def build_user_vector(answers):
     vec = dict.fromkeys(PARAMS, 0.0)
 
@@ -71,7 +76,7 @@ def build_city_vector(row):
     vec["nightlife"] = np.log1p(row["Population Density"]) + (row["Youth Dependency Ratio"] * 0.5)
     vec["job_market"] = row["GDP per Capita"] - (row["Unemployment Rate"] * 500)
     vec["safety"] = row["GDP per Capita"] - (row["Unemployment Rate"] * 200)
-    vec["international"] = 1.0 if "English" in str(row["Main Spoken Languages"]) else 0.0
+    vec["international"] = 1.0 if speaks(row["Main Spoken Languages"], "English") else 0.0
     if row["GDP per Capita"] > 40000:
         vec["international"] += 0.5
     vec["walkability"] = np.sqrt(row["Population Density"])
@@ -80,29 +85,19 @@ def build_city_vector(row):
     vec["air_quality"] = row["Air Quality Index"] - (row["CO2 Emissions (per capita)"] * 2)
     return vec
 
-def build_city_matrix(df):
-    city_vectors = [build_city_vector(row) for _, row in df.iterrows()]
-    city_df = pd.DataFrame(city_vectors)
-    city_df.index = df["City"]
-    return normalize(city_df)
+@profiled()
+def build_city_matrix(df, languages=None):
+    # Columnar equivalent of build_city_vector applied to every row;
+    # languages is an optional LanguageIndex built on df
+    return city_feature_frame(df, normalized=True, languages=languages)
 
+@profiled()
 def normalize(df):
-    df_norm = df.copy()
-    for c in df.columns:
-        min_v, max_v = df[c].min(), df[c].max()
-        df_norm[c] = (df[c] - min_v) / (max_v - min_v) if max_v - min_v != 0 else 0
-    return df_norm
+    values = minmax_normalize(df.to_numpy(dtype=float))
+    return pd.DataFrame(values, index=df.index, columns=df.columns)
 
-def recommend_cities(user_vc, city_df, top_n=3):
-    params_order = city_df.columns.tolist()
-    user_vec_arr = np.array([user_vc[p] for p in params_order])
-    user_vec_arr /= (np.linalg.norm(user_vec_arr) + 1e-6)
-
-    scores = {}
-    for city in city_df.index:
-        city_vec = city_df.loc[city].values
-        city_vec /= (np.linalg.norm(city_vec) + 1e-6)
-        scores[city] = np.dot(city_vec, user_vec_arr)
-
-    sorted_cities = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    return [c for c, _ in sorted_cities[:top_n]], [s for _, s in sorted_cities[:top_n]]
+@profiled()
+def recommend_cities(user_vc, city_df, top_n=3, scorer=None):
+    # Pass a prebuilt CityScorer to reuse its normalized matrix across calls
+    scorer = scorer or CityScorer(city_df)
+    return scorer.recommend(user_vc, top_n=top_n)
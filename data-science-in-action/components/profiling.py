@@ -0,0 +1,133 @@
+"""In-process timing of page reruns and hot component calls.
+
+Wrap a block in `with timed("stage"):` or a function in `@profiled()`. While
+profiling is enabled, each call appends a record (wall time and net change
+in allocated memory blocks) to a process-wide ring buffer. While disabled,
+both cost one flag check. Switch it on with WSIL_PROFILE=1 or enable().
+"""
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+BUFFER_SIZE = 20_000
+FIELDS = ["run", "page", "stage", "depth", "start", "seconds", "blocks", "thread"]
+
+ENABLED = os.environ.get("WSIL_PROFILE", "") not in ("", "0")
+RECORDS = deque(maxlen=BUFFER_SIZE)
+
+_runs = itertools.count(1)
+_local = threading.local()
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def is_enabled():
+    return ENABLED
+
+
+def start_run(page):
+    # Groups the records of one script run in this thread under a new id
+    _local.run = next(_runs)
+    _local.page = page
+    _local.started = time.perf_counter()
+    _local.depth = 0
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def run_elapsed():
+    # Seconds since start_run in this thread
+    return time.perf_counter() - getattr(_local, "started", time.perf_counter())
+
+
+class timed:
+    __slots__ = ("stage", "_start", "_blocks")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self._start = None
+
+    def __enter__(self):
+        if ENABLED:
+            _local.depth = getattr(_local, "depth", 0) + 1
+            self._blocks = sys.getallocatedblocks()
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is None:
+            return False
+        seconds = time.perf_counter() - self._start
+        blocks = sys.getallocatedblocks() - self._blocks
+        _local.depth -= 1
+        RECORDS.append((
+            getattr(_local, "run", None),
+            getattr(_local, "page", None),
+            self.stage,
+            _local.depth,
+            self._start - getattr(_local, "started", self._start),
+            seconds,
+            blocks,
+            threading.current_thread().name,
+        ))
+        return False
+
+
+def profiled(stage=None):
+    def decorate(func):
+        name = stage or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def records(run=None):
+    # Snapshot of the buffer, optionally one run only, as a DataFrame
+    df = pd.DataFrame(list(RECORDS), columns=FIELDS)
+    if run is not None:
+        df = df[df["run"] == run]
+    return df.sort_values(["run", "start"], kind="stable", na_position="first").reset_index(drop=True)
+
+
+def summary(df):
+    # Per-stage totals, slowest first
+    return (
+        df.groupby("stage", sort=False)
+        .agg(calls=("seconds", "size"), total_s=("seconds", "sum"), max_s=("seconds", "max"), blocks=("blocks", "sum"))
+        .sort_values("total_s", ascending=False)
+    )
+
+
+def export_json(path=None, run=None):
+    text = json.dumps(records(run).to_dict(orient="records"), indent=1)
+    if path is None:
+        return text
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def export_csv(path=None, run=None):
+    return records(run).to_csv(path, index=False)
+
+
+def clear():
+    RECORDS.clear()
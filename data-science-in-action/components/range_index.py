@@ -0,0 +1,72 @@
+import numpy as np
+
+# Range constraints find_matching applies, as (column, bound kind)
+RANGE_CONSTRAINTS = {
+    "Average Rent Price": "max",
+    "Average Cost of Living": "max",
+    "Average Monthly Salary": "min",
+}
+
+
+class RangeIndex:
+    """Presorted column arrays for answering min/max constraints on a city table.
+
+    Each constraint is resolved with a binary search on its sorted column; the
+    most selective one drives the scan and the others are checked only on its
+    candidates. Queries return row positions into the indexed frame.
+    """
+
+    # Above this share of rows, scattering matches into a mask is cheaper
+    # than sorting them back into row order
+    DENSE_FRACTION = 1 / 16
+
+    def __init__(self, df, constraints=RANGE_CONSTRAINTS):
+        self.constraints = dict(constraints)
+        self.n_rows = len(df)
+        self.values = {col: df[col].to_numpy(dtype=np.float64) for col in self.constraints}
+        self.order = {}
+        self.sorted = {}
+        self.n_valid = {}
+        for col, values in self.values.items():
+            order = np.argsort(values, kind="stable")
+            self.order[col] = order
+            # Every column laid out in this column's order, so checking the
+            # other bounds over a span is a contiguous scan, not a gather
+            self.sorted[col] = {other: v[order] for other, v in self.values.items()}
+            # argsort places NaN last; NaN never satisfies a bound
+            self.n_valid[col] = int(np.count_nonzero(~np.isnan(values)))
+
+    def span(self, col, bound):
+        # Slice of the sorted column that satisfies the bound
+        sorted_values, n_valid = self.sorted[col][col], self.n_valid[col]
+        if self.constraints[col] == "max":
+            return 0, int(np.searchsorted(sorted_values[:n_valid], bound, side="right"))
+        return int(np.searchsorted(sorted_values[:n_valid], bound, side="left")), n_valid
+
+    def count(self, pref):
+        # Upper bound on matches, from binary searches alone
+        spans = [self.span(col, pref[col]) for col in self.constraints if col in pref]
+        return min((hi - lo for lo, hi in spans), default=self.n_rows)
+
+    def positions(self, pref):
+        # Ascending row positions satisfying every constraint present in pref
+        spans = {col: self.span(col, pref[col]) for col in self.constraints if col in pref}
+        if not spans:
+            return np.arange(self.n_rows)
+        driver = min(spans, key=lambda col: spans[col][1] - spans[col][0])
+        lo, hi = spans[driver]
+        keep = np.ones(hi - lo, dtype=bool)
+        for col in spans:
+            if col == driver:
+                continue
+            values = self.sorted[driver][col][lo:hi]
+            if self.constraints[col] == "max":
+                keep &= values <= pref[col]
+            else:
+                keep &= values >= pref[col]
+        matches = self.order[driver][lo:hi][keep]
+        if len(matches) > self.n_rows * self.DENSE_FRACTION:
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[matches] = True
+            return np.flatnonzero(mask)
+        return np.sort(matches)
@@ -0,0 +1,117 @@
+import numpy as np
+
+# Columns find_matching scores on, with their sign in the rank sum
+SCORE_WEIGHTS = {
+    "GDP per Capita": 1.0,
+    "Average Monthly Salary": 1.0,
+    "Unemployment Rate": -1.0,
+}
+
+
+class PercentileRanker:
+    """Percentile ranks of any row subset, from one global sort per column.
+
+    Each column is argsorted once and its rows labelled with a dense tie-group
+    id. A subset's average ranks (as pandas rank(pct=True) computes them) then
+    follow from counting group ids, without sorting the subset again.
+    """
+
+    def __init__(self, df, weights=SCORE_WEIGHTS):
+        self.weights = dict(weights)
+        self.n_rows = len(df)
+        self.groups = {}
+        self.n_groups = {}
+        for col in self.weights:
+            values = df[col].to_numpy(dtype=np.float64)
+            order = np.argsort(values, kind="stable")
+            sorted_values = values[order]
+            new_group = np.ones(len(values), dtype=bool)
+            new_group[1:] = sorted_values[1:] != sorted_values[:-1]
+            groups = np.empty(len(values), dtype=np.intp)
+            groups[order] = np.cumsum(new_group) - 1
+            n_groups = int(new_group[~np.isnan(sorted_values)].sum())
+            # NaN rows get group -1 and stay unranked, like pandas
+            groups[np.isnan(values)] = -1
+            self.groups[col] = groups
+            self.n_groups[col] = n_groups
+
+    def pct_ranks(self, col, positions):
+        # Average-method percentile rank of each position within the subset
+        g = self.groups[col][positions]
+        valid = g >= 0
+        gv = g[valid]
+        m = len(gv)
+        if m * max(1, int(np.log2(m + 1))) < self.n_groups[col]:
+            # Small subset: binary search its own sorted group ids
+            s = np.sort(gv)
+            left = np.searchsorted(s, gv, side="left")
+            right = np.searchsorted(s, gv, side="right")
+        else:
+            # Large subset: counting pass over the group ids, linear time
+            counts = np.bincount(gv, minlength=self.n_groups[col])
+            right = np.cumsum(counts)[gv]
+            left = right - counts[gv]
+        ranks = np.full(len(positions), np.nan)
+        ranks[valid] = (left + 1 + right) / 2 / m
+        return ranks
+
+    def scores(self, positions, weights=None):
+        weights = self.weights if weights is None else weights
+        score = np.zeros(len(positions))
+        for col, weight in weights.items():
+            if weight:
+                score += weight * self.pct_ranks(col, positions)
+        return score
+
+    def rank(self, positions, weights=None):
+        positions = np.asarray(positions)
+        return RankedMatches(positions, self.scores(positions, weights))
+
+
+class RankedMatches:
+    """Matching row positions with their scores, ordered lazily.
+
+    Only the rows a caller asks for (top, page) are selected and sorted; ties
+    keep the original row order and NaN scores go last.
+    """
+
+    def __init__(self, positions, scores):
+        self.positions = positions
+        self.scores = scores
+        # Ascending key: best score first, NaN last
+        self._key = np.where(np.isnan(scores), np.inf, -scores)
+        self._order = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _top(self, n):
+        key = self._key
+        if self._order is not None or n >= len(key):
+            return self.order()[:n]
+        if n <= 0:
+            return np.empty(0, dtype=np.intp)
+        kth = np.partition(key, n - 1)[n - 1]
+        better = np.flatnonzero(key < kth)
+        ties = np.flatnonzero(key == kth)[:n - len(better)]
+        chosen = np.sort(np.concatenate([better, ties]))
+        return chosen[np.argsort(key[chosen], kind="stable")]
+
+    def order(self):
+        # Full ranking, computed once and reused
+        if self._order is None:
+            self._order = np.argsort(self._key, kind="stable")
+        return self._order
+
+    def top(self, n):
+        idx = self._top(n)
+        return self.positions[idx], self.scores[idx]
+
+    def page(self, number, size):
+        # Rows of page `number` (0-based); only ranks up to its end are resolved
+        idx = self._top((number + 1) * size)[number * size:]
+        return self.positions[idx], self.scores[idx]
+
+    def frame(self, df, n=None):
+        positions, _ = self.top(len(self) if n is None else n)
+        return df.take(positions)
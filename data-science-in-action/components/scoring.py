@@ -0,0 +1,70 @@
+import numpy as np
+
+EPS = 1e-6
+
+
+def unit_rows(matrix):
+    # Same damping as recommend_cities used per city: v / (|v| + 1e-6)
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return matrix / (np.linalg.norm(matrix, axis=-1, keepdims=True) + EPS)
+
+
+def top_k(scores, k):
+    # Partial selection of the k best columns per row, best first.
+    # Ties keep the lower column index first, like a stable sort would.
+    scores = np.atleast_2d(scores)
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.intp), empty
+    if k < n:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(n), scores.shape)
+    part = np.sort(part, axis=1)
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    idx = np.take_along_axis(part, order, axis=1)
+    return idx, np.take_along_axis(scores, idx, axis=1)
+
+
+class CityScorer:
+    """Cosine scorer over a normalized city matrix (cities x PARAMS).
+
+    The L2-normalized matrix is computed once; the caller's frame is never
+    modified, so one instance can be shared across sessions.
+    """
+
+    def __init__(self, city_df):
+        self.cities = city_df.index.to_numpy()
+        self.params = city_df.columns.tolist()
+        self.unit = unit_rows(city_df.to_numpy(dtype=np.float64))
+        self.unit.setflags(write=False)
+
+    def user_matrix(self, user_vectors):
+        # Accepts one user dict or a list of them, returns (n_users, n_params)
+        if isinstance(user_vectors, dict):
+            user_vectors = [user_vectors]
+        users = np.array([[u[p] for p in self.params] for u in user_vectors], dtype=np.float64)
+        return unit_rows(users.reshape(-1, len(self.params)))
+
+    def scores(self, user_vectors):
+        return self.user_matrix(user_vectors) @ self.unit.T
+
+    def top_k(self, user_vectors, k=3, block=4_000_000):
+        # Score the batch in slices so the score block stays ~block floats
+        users = self.user_matrix(user_vectors)
+        step = max(1, block // max(1, len(self.cities)))
+        parts = [top_k(users[i:i + step] @ self.unit.T, k) for i in range(0, len(users), step)]
+        if not parts:
+            return top_k(np.empty((0, len(self.cities))), k)
+        return np.vstack([p[0] for p in parts]), np.vstack([p[1] for p in parts])
+
+    def recommend(self, user_vc, top_n=3):
+        idx, scores = self.top_k(user_vc, top_n)
+        return self.cities[idx[0]].tolist(), scores[0].tolist()
+
+    def recommend_batch(self, user_vectors, top_n=3):
+        idx, scores = self.top_k(user_vectors, top_n)
+        return [(self.cities[i].tolist(), s.tolist()) for i, s in zip(idx, scores)]
@@ -0,0 +1,113 @@
+import numpy as np
+
+from components.profiling import profiled
+from components.scoring import EPS, top_k
+
+# Range of each dimension weight the explorer and its stability report cover
+WEIGHT_RANGE = (-1.0, 1.0)
+# Top-k changes listed per dimension and direction
+MAX_EVENTS = 5
+# Incremental updates between two exact recomputations (bounds float drift)
+REFRESH_EVERY = 256
+
+
+class WeightExplorer:
+    """Cosine scores of every city while the user's dimension weights change.
+
+    Keeps the raw scores unit @ weights against a scorer's cached unit city
+    matrix. Changing one weight by d adds d times that dimension's column:
+    a rank-1, O(n) update instead of the full O(n * dims) product. Dividing
+    by the weights' norm (as unit_rows does) gives the scores recommend
+    returns; the order never depends on it.
+    """
+
+    def __init__(self, scorer, weights):
+        self.cities = scorer.cities
+        self.params = list(scorer.params)
+        self.unit = scorer.unit
+        # Each dimension's column contiguous, for the rank-1 updates
+        self.columns = np.ascontiguousarray(self.unit.T)
+        self.weights = np.array([weights[p] for p in self.params], dtype=np.float64)
+        self.refresh()
+
+    def refresh(self):
+        self.raw = self.unit @ self.weights
+        self.updates = 0
+
+    def set_weight(self, param, value):
+        j = self.params.index(param)
+        delta = float(value) - self.weights[j]
+        if delta == 0:
+            return
+        self.weights[j] = value
+        self.updates += 1
+        if self.updates >= REFRESH_EVERY:
+            self.refresh()
+        else:
+            self.raw += delta * self.columns[j]
+
+    def update(self, weights):
+        # Apply only the weights that changed, one rank-1 update each
+        for param, value in weights.items():
+            self.set_weight(param, value)
+
+    def scale(self):
+        return 1.0 / (np.linalg.norm(self.weights) + EPS)
+
+    def scores(self):
+        return self.raw * self.scale()
+
+    @profiled("sensitivity.top")
+    def top(self, k=3):
+        idx, raw = top_k(self.raw, k)
+        return self.cities[idx[0]].tolist(), (raw[0] * self.scale()).tolist()
+
+    @profiled("sensitivity.stability")
+    def stability(self, k=3, low=WEIGHT_RANGE[0], high=WEIGHT_RANGE[1], max_events=MAX_EVENTS):
+        # Where the current top k changes as each weight alone moves over
+        # [low, high]: rows of (param, weight, threshold, rising city,
+        # falling city, whether the rising city enters the top k)
+        idx, _ = top_k(self.raw, k)
+        start = idx[0]
+        events = []
+        for j, param in enumerate(self.params):
+            w = self.weights[j]
+            for bound in (low, high):
+                for threshold, rises, falls, enters in _sweep(self.raw, self.columns[j], start, w, bound, max_events):
+                    events.append((param, w, threshold, self.cities[rises], self.cities[falls], enters))
+        return events
+
+
+def _sweep(raw, column, ranked, w, bound, max_events):
+    # Kinetic sweep of one weight from w towards bound. Every score is a line
+    # in the weight, so the ordered top k first changes where two adjacent
+    # ranked cities cross, or where an outside city crosses the k-th one.
+    # Yields (weight, rising, falling, enters) for each such change.
+    direction = 1.0 if bound >= w else -1.0
+    ranked = np.array(ranked)
+    if not len(ranked):
+        return
+    outside = np.ones(len(raw), dtype=bool)
+    outside[ranked] = False
+    slope = column * direction
+    t = 0.0  # distance travelled from w
+    for _ in range(max_events):
+        values = raw + t * slope
+        # Each ranked city against the one below it, the k-th against every outside city
+        above = np.concatenate([ranked[:-1], np.full(outside.sum(), ranked[-1])])
+        below = np.concatenate([ranked[1:], np.flatnonzero(outside)])
+        gain = slope[below] - slope[above]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            steps = np.where(gain > 0, np.maximum(values[above] - values[below], 0) / gain, np.inf)
+        i = int(np.argmin(steps)) if len(steps) else 0
+        if not len(steps) or t + steps[i] > abs(bound - w):
+            return
+        t += steps[i]
+        rises, falls = int(below[i]), int(above[i])
+        enters = i >= len(ranked) - 1
+        if enters:
+            ranked[-1] = rises
+            outside[rises], outside[falls] = False, True
+        else:
+            ranked[i], ranked[i + 1] = rises, falls
+        yield w + direction * t, rises, falls, enters
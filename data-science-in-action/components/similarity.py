@@ -0,0 +1,162 @@
+import hashlib
+import os
+
+import numpy as np
+
+from components.profiling import profiled
+from components.scoring import CityScorer, top_k, unit_rows
+
+CACHE_DIR = "data/.cache"
+
+# Below this many cities brute force is already sub-millisecond
+AUTO_IVF_MIN_CITIES = 50_000
+
+
+def matrix_version(city_df):
+    # Content hash of a normalized city matrix: names, columns and values
+    h = hashlib.sha1()
+    h.update("\x1f".join(map(str, city_df.index)).encode())
+    h.update("\x1f".join(map(str, city_df.columns)).encode())
+    h.update(np.ascontiguousarray(city_df.to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()[:16]
+
+
+class ExactIndex(CityScorer):
+    kind = "exact"
+
+    def __init__(self, city_df, **options):
+        # IVF-only options (n_lists, n_probe, ...) have nothing to tune here
+        super().__init__(city_df)
+        self.options = {}
+
+    def query(self, user_vectors, k=3):
+        return self.top_k(user_vectors, k)
+
+    def _arrays(self):
+        return {}
+
+    def _load_arrays(self, arrays):
+        pass
+
+    @classmethod
+    def from_arrays(cls, cities, params, unit, arrays, **options):
+        index = cls.__new__(cls)
+        index.cities, index.params, index.unit = cities, list(params), unit
+        index.unit.setflags(write=False)
+        index.options = options
+        index._load_arrays(arrays)
+        return index
+
+
+class IVFIndex(ExactIndex):
+    """Inverted-file index: spherical k-means cells, exact re-scoring inside
+    the n_probe cells closest to the query."""
+
+    kind = "ivf"
+
+    def __init__(self, city_df, n_lists=None, n_probe=8, n_iter=10, seed=0):
+        super().__init__(city_df)
+        n = len(self.cities)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        self.options = {"n_lists": n_lists, "n_probe": n_probe}
+        self.centroids, assign = _spherical_kmeans(self.unit, n_lists, n_iter, seed)
+        self.order = np.argsort(assign, kind="stable")
+        self.offsets = np.searchsorted(assign[self.order], np.arange(n_lists + 1))
+
+    def _arrays(self):
+        return {"centroids": self.centroids, "order": self.order, "offsets": self.offsets}
+
+    def _load_arrays(self, arrays):
+        self.centroids = arrays["centroids"]
+        self.order = arrays["order"]
+        self.offsets = arrays["offsets"]
+
+    def top_k(self, user_vectors, k=3, n_probe=None):
+        users = self.user_matrix(user_vectors)
+        n_probe = min(n_probe or self.options["n_probe"], len(self.centroids))
+        cells, _ = top_k(users @ self.centroids.T, n_probe)
+
+        k_out = min(k, len(self.cities))
+        idx = np.zeros((len(users), k_out), dtype=np.intp)
+        scores = np.zeros((len(users), k_out))
+        for u, (user, probe) in enumerate(zip(users, cells)):
+            candidates = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+            candidates.sort()
+            if len(candidates) < k_out:
+                # Probed cells too small to fill k: fall back to brute force
+                candidates = np.arange(len(self.cities))
+            best, best_scores = top_k(self.unit[candidates] @ user, k_out)
+            idx[u] = candidates[best[0]]
+            scores[u] = best_scores[0]
+        return idx, scores
+
+
+def _spherical_kmeans(unit, n_lists, n_iter, seed, block=200_000):
+    rng = np.random.default_rng(seed)
+    n = len(unit)
+    centroids = unit[rng.choice(n, size=min(n_lists, n), replace=False)].copy()
+    assign = np.zeros(n, dtype=np.intp)
+    for _ in range(n_iter):
+        for i in range(0, n, block):
+            assign[i:i + block] = np.argmax(unit[i:i + block] @ centroids.T, axis=1)
+        sums = np.column_stack([
+            np.bincount(assign, weights=unit[:, j], minlength=len(centroids))
+            for j in range(unit.shape[1])
+        ])
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = unit_rows(sums)
+    return centroids, assign
+
+
+BACKENDS = {"exact": ExactIndex, "ivf": IVFIndex}
+
+
+def build_index(city_df, kind="auto", **options):
+    if kind == "auto":
+        kind = "ivf" if len(city_df) >= AUTO_IVF_MIN_CITIES else "exact"
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown index kind '{kind}', expected one of {list(BACKENDS)}")
+    return BACKENDS[kind](city_df, **options)
+
+
+def save_index(index, path):
+    np.savez(
+        path,
+        kind=index.kind,
+        cities=index.cities.astype(str),
+        params=np.array(index.params),
+        unit=index.unit,
+        options=np.array(list(getattr(index, "options", {}).items()), dtype=object).astype(str),
+        **index._arrays()
+    )
+
+
+def load_index(path):
+    with np.load(path) as data:
+        arrays = {k: data[k] for k in data.files}
+    options = {k: int(v) for k, v in arrays.pop("options").reshape(-1, 2)}
+    cls = BACKENDS[str(arrays.pop("kind"))]
+    return cls.from_arrays(arrays.pop("cities"), arrays.pop("params"), arrays.pop("unit"), arrays, **options)
+
+
+@profiled()
+def cached_index(city_df, kind="auto", cache_dir=CACHE_DIR, **options):
+    # One index file per (dataset version, backend, options); rebuilt only
+    # when the normalized city matrix changes
+    if kind == "auto":
+        kind = "ivf" if len(city_df) >= AUTO_IVF_MIN_CITIES else "exact"
+    if kind == "exact":
+        options = {}
+    tag = "-".join(f"{k}{v}" for k, v in sorted(options.items()))
+    path = os.path.join(cache_dir, f"index-{kind}-{matrix_version(city_df)}{'-' + tag if tag else ''}.npz")
+    if os.path.exists(path):
+        return load_index(path)
+    index = build_index(city_df, kind=kind, **options)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write then rename so concurrent workers never read a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        save_index(index, f)
+    os.replace(tmp, path)
+    return index
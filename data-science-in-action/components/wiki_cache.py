@@ -0,0 +1,218 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+import requests
+
+from components.profiling import profiled
+
+API_URL = os.environ.get("WIKI_API_URL", "https://en.wikipedia.org/w/api.php")
+DB_PATH = os.path.join("data", ".cache", "wikipedia.sqlite")
+USER_AGENT = "WhereShouldILive/1.0 (https://github.com/saifhoque15-netizen/where-should-I-live)"
+
+TTL_SECONDS = 7 * 24 * 3600
+# Missing pages are looked up again after this long
+FAILURE_TTL_SECONDS = 300
+# Other failed fetches (timeouts, connection or server errors) after this long:
+# enough to spare callers waiting on the same fetch, short enough to recover
+ERROR_TTL_SECONDS = 5
+MAX_ENTRIES = 5000
+MEMORY_ENTRIES = 256
+SUMMARY_SENTENCES = 10
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def title_from(url_or_title):
+    # Page title from a Wikipedia URL, or the title itself; None for a
+    # missing value (NaN, None, blank)
+    if not isinstance(url_or_title, str) or not url_or_title.strip():
+        return None
+    if url_or_title.startswith("http"):
+        return unquote(url_or_title.split("/")[-1]).replace("_", " ")
+    return url_or_title
+
+
+def is_missing(error):
+    # Whether a fetch failed because the page does not exist, rather than
+    # for a reason a retry might fix
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code == 404
+    return isinstance(error, LookupError)
+
+
+class WikiClient:
+    """Minimal MediaWiki API client on a pooled requests session."""
+
+    def __init__(self, api_url=API_URL, session=None, timeout=10):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+
+    def _query(self, **params):
+        params = {"action": "query", "format": "json", "redirects": 1, **params}
+        while True:
+            response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+            yield payload.get("query", {})
+            if "continue" not in payload:
+                return
+            params.update(payload["continue"])
+
+    def summary(self, title, sentences=SUMMARY_SENTENCES):
+        for query in self._query(prop="extracts", explaintext=1, exsentences=sentences, titles=title):
+            for page in query.get("pages", {}).values():
+                if "missing" in page:
+                    raise LookupError(f"Page '{title}' does not exist")
+                return page.get("extract", "")
+        raise LookupError(f"Page '{title}' does not exist")
+
+    def images(self, title):
+        urls = []
+        for query in self._query(generator="images", gimlimit="max", prop="imageinfo", iiprop="url", titles=title):
+            for page in query.get("pages", {}).values():
+                urls.extend(info["url"] for info in page.get("imageinfo", []) if "url" in info)
+        return urls
+
+    @profiled("wiki_cache.fetch")
+    def fetch(self, title):
+        return {"summary": self.summary(title), "images": self.images(title)}
+
+
+class WikiCache:
+    """Per-title page cache: in-memory LRU in front of an SQLite table.
+
+    Entries expire after ttl seconds; the table keeps at most max_entries
+    rows, evicting the least recently used. Missing pages are remembered in
+    memory for failure_ttl seconds, other failed fetches for error_ttl.
+    Safe to share between threads.
+    """
+
+    def __init__(self, client=None, db_path=DB_PATH, ttl=TTL_SECONDS,
+                 max_entries=MAX_ENTRIES, memory_entries=MEMORY_ENTRIES,
+                 failure_ttl=FAILURE_TTL_SECONDS, error_ttl=ERROR_TTL_SECONDS):
+        self.client = client or WikiClient()
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.error_ttl = error_ttl
+        self._failures = {}
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="wiki-prefetch")
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "title TEXT PRIMARY KEY, payload TEXT, fetched_at REAL, accessed_at REAL)"
+        )
+        self._db.commit()
+
+    def _remember(self, title, entry):
+        self._memory[title] = entry
+        self._memory.move_to_end(title)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, title, now):
+        entry = self._memory.get(title)
+        if entry is not None and now - entry["fetched_at"] < self.ttl:
+            self._memory.move_to_end(title)
+            return entry
+        row = self._db.execute(
+            "SELECT payload, fetched_at FROM pages WHERE title = ?", (title,)
+        ).fetchone()
+        if row is None or now - row[1] >= self.ttl:
+            return None
+        entry = {**json.loads(row[0]), "fetched_at": row[1]}
+        self._db.execute("UPDATE pages SET accessed_at = ? WHERE title = ?", (now, title))
+        self._db.commit()
+        self._remember(title, entry)
+        return entry
+
+    def _store(self, title, entry, now):
+        payload = json.dumps({k: v for k, v in entry.items() if k != "fetched_at"})
+        self._db.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (title, payload, now, now)
+        )
+        self._db.execute("DELETE FROM pages WHERE fetched_at <= ?", (now - self.ttl,))
+        self._db.execute(
+            "DELETE FROM pages WHERE title NOT IN "
+            "(SELECT title FROM pages ORDER BY accessed_at DESC LIMIT ?)", (self.max_entries,)
+        )
+        self._db.commit()
+        self._remember(title, entry)
+
+    def get(self, url_or_title):
+        # {"summary": str, "images": [url, ...]}; one fetch per title per TTL
+        title = title_from(url_or_title)
+        if title is None:
+            raise LookupError("No Wikipedia page given")
+        with self._lock:
+            now = time.time()
+            entry = self._lookup(title, now)
+            if entry is not None:
+                return entry
+            failure = self._failures.get(title)
+            if failure is not None:
+                error, failed_at, missing = failure
+                if now - failed_at < (self.failure_ttl if missing else self.error_ttl):
+                    # A new exception per caller: the stored one is shared between threads
+                    raise (LookupError if missing else RuntimeError)(str(error)) from error
+            # Concurrent callers for the same title wait on one fetch
+            event = self._inflight.get(title)
+            owner = event is None
+            if owner:
+                event = self._inflight[title] = threading.Event()
+        if not owner:
+            event.wait()
+            with self._lock:
+                entry = self._lookup(title, time.time())
+            return entry if entry is not None else self.get(url_or_title)
+        try:
+            entry = {**self.client.fetch(title), "fetched_at": time.time()}
+            with self._lock:
+                self._store(title, entry, entry["fetched_at"])
+                self._failures.pop(title, None)
+            return entry
+        except Exception as e:
+            # Waiting callers and reruns soon after get this error instead
+            # of calling the API again
+            with self._lock:
+                self._failures[title] = (e, time.time(), is_missing(e))
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[title]
+            event.set()
+
+    def prefetch(self, urls_or_titles, wait=True):
+        # Fetch several titles concurrently. With wait=False the futures are
+        # returned at once and later get() calls join the in-flight fetches;
+        # otherwise each input maps to its entry or the exception raised.
+        futures = {key: self._pool.submit(self.get, key) for key in urls_or_titles if title_from(key) is not None}
+        if not wait:
+            return futures
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                results[key] = e
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._failures.clear()
+            self._db.execute("DELETE FROM pages")
+            self._db.commit()
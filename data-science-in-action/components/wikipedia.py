@@ -1,36 +1,35 @@
 import streamlit as st
-import wikipedia as wk
-from time import time
-import pandas as pd
+from components.wiki_cache import WikiCache, IMAGE_EXTENSIONS
+from components.profiling import profiled
 
 def show_warning(message):
     st.warning(message)
 
+@st.cache_resource
+def wiki_cache():
+    # One cache per process, shared by every session
+    return WikiCache()
+
+def wiki_prefetch(urls_or_titles):
+    # Start all lookups in the background; later wiki_* calls join them
+    return wiki_cache().prefetch(urls_or_titles, wait=False)
+
+@profiled()
 def wiki_summary(url_or_title):
     try:
-        # If you have a URL, extract the last part as the page title
-        if url_or_title.startswith("http"):
-            title = url_or_title.split("/")[-1].replace("_", " ")
-        else:
-            title = url_or_title
-        
-        summ = wk.summary(title, sentences=10)  # first 10 sentences
+        summ = wiki_cache().get(url_or_title)["summary"]
         summ = summ.replace("`", "")
         return summ
     except Exception as e:
         st.warning(f"Error retrieving summary: {str(e)}")
         return None
 
+@profiled()
 def wiki_images(url_or_title):
     try:
-        if url_or_title.startswith("http"):
-            title = url_or_title.split("/")[-1].replace("_", " ")
-        else:
-            title = url_or_title
-
-        page = wk.page(title)
-        img_urls = [img for img in page.images if img.lower().endswith(('.jpg', '.jpeg', '.png'))]
+        images = wiki_cache().get(url_or_title)["images"]
+        img_urls = [img for img in images if img.lower().endswith(IMAGE_EXTENSIONS)]
         return img_urls
     except Exception as e:
         st.warning(f"Error retrieving images: {str(e)}")
-        return []
\ No newline at end of file
+        return []
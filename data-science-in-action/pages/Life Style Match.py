@@ -2,11 +2,19 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 from PIL import Image
-from components.preferences import build_user_vector, build_city_matrix, normalize, recommend_cities
+from components.preferences import PARAMS, build_user_vector, build_city_matrix, normalize
+from components.sensitivity import WeightExplorer, WEIGHT_RANGE
+from components.similarity import cached_index
+from components.answer_table import QUESTIONS, cached_table
+from components.languages import LanguageIndex
+from components.data import load_merged
+from components.column_store import open_store, dataset_version
+from components.debug_panel import profile_page, debug_panel
 
 # --- Page Config and Favicon---
 favicon = Image.open("data-science-in-action/images/house.png")
 st.set_page_config(page_title="City Comparison", layout="wide", page_icon=favicon)
+profile_page("Life Style Match")
 
 # --- Header ---
 st.markdown(
@@ -26,20 +34,84 @@ if "answers" not in st.session_state:
     st.session_state.answers = {}
 
 # --- Load and Merge Data ---
-@st.cache_data
-def load_data(url):
-    return pd.read_csv(url)
-
-cities_df = load_data("data/city_data_with_coordinates.csv")
-health_df = load_data("data/health.csv")
-env_df = load_data("data/environment.csv")
-
-cities_df = cities_df.merge(health_df, on=['City', 'Country'])
-cities_df = cities_df.merge(env_df, on=['City', 'Country'])
+cities_df = load_merged()
 
 # --- Build City Vector + Normalization Matrix ---
-city_vectors = build_city_matrix(cities_df)
-city_vectors_norm = normalize(city_vectors)
+@st.cache_resource
+def load_language_index():
+    return LanguageIndex(load_merged())
+
+# Shared read-only matrix from the exported column store when it is current;
+# keyed on the dataset version so changed CSVs are picked up without a restart
+@st.cache_resource
+def load_store(version):
+    return open_store(version=version)
+
+store = load_store(dataset_version())
+if store is not None:
+    city_vectors_norm = store.matrix("lifestyle")
+else:
+    city_vectors = build_city_matrix(cities_df, languages=load_language_index())
+    city_vectors_norm = normalize(city_vectors)
+
+# Similarity index over the normalized matrix, persisted per dataset version
+@st.cache_resource
+def load_city_index(city_vectors_norm):
+    return cached_index(city_vectors_norm)
+
+city_index = load_city_index(city_vectors_norm)
+
+# Top cities for all 891 answer sets, rebuilt when the city data changes
+@st.cache_resource
+def load_answer_table(city_vectors_norm):
+    return cached_table(city_vectors_norm, scorer=load_city_index(city_vectors_norm))
+
+answer_table = load_answer_table(city_vectors_norm)
+
+
+# --- Weight Explorer ---
+# Sliders rerun only this fragment; each moved slider is one rank-1 score update
+@st.fragment
+def weight_explorer(user_vec):
+    with st.expander("🎚️ Tune the weights"):
+        weights = {param: float(value) for param, value in user_vec.items()}
+        # A new questionnaire resets the sliders and the explorer
+        if st.session_state.get("explorer_weights") != weights:
+            st.session_state.explorer_weights = weights
+            st.session_state.explorer = WeightExplorer(city_index, weights)
+            for param, value in weights.items():
+                st.session_state[f"weight_{param}"] = value
+
+        low, high = WEIGHT_RANGE
+        cols = st.columns(2)
+        tuned = {
+            param: cols[i % 2].slider(param.replace("_", " ").title(), low, high, step=0.01, key=f"weight_{param}")
+            for i, param in enumerate(PARAMS)
+        }
+        explorer = st.session_state.explorer
+        explorer.update(tuned)
+
+        top_cities, top_scores = explorer.top(3)
+        st.dataframe(pd.DataFrame(
+            {"City": top_cities, "Score": top_scores}, index=pd.RangeIndex(1, len(top_cities) + 1, name="Rank")
+        ))
+
+        # Where moving a single weight would change the top 3
+        report = pd.DataFrame(
+            explorer.stability(3),
+            columns=["Dimension", "Weight", "Threshold", "Rises", "Falls", "Enters"]
+        )
+        if report.empty:
+            st.write("The top 3 stays the same over the whole range of every weight.")
+            return
+        report["Change"] = np.where(
+            report["Enters"],
+            report["Rises"] + " replaces " + report["Falls"] + " in the top 3",
+            report["Rises"] + " overtakes " + report["Falls"]
+        )
+        report = report.assign(Distance=(report["Threshold"] - report["Weight"]).abs()).sort_values(["Dimension", "Distance"])
+        st.markdown("**Stability:** the weight at which each change happens, if only that weight moves")
+        st.dataframe(report[["Dimension", "Weight", "Threshold", "Change"]].round(2), hide_index=True)
 
 
 # --- Sidebar Inputs ---
@@ -47,22 +119,22 @@ with st.sidebar:
     with st.form("lifestyle_form"):
         q1 = st.radio(
             "Your perfect Saturday looks like:",
-            ["Hiking or being in nature", "Cafés, museums, slow walks", "Bars, clubs, and nightlife"]
+            QUESTIONS["weekend"]
         )
 
         q2 = st.radio(
             "Your ideal home is:",
-            ["Small but central", "Spacious and quiet", "Flexible, I adapt easily"]
+            QUESTIONS["home"]
         )
 
         q3 = st.radio(
             "You meet people mostly through:",
-            ["Work and professional networks", "Community events and hobbies", "Expat or international circles"]
+            QUESTIONS["social"]
         )
 
         q4 = st.radio(
             "Your daily rhythm is:",
-            ["Early mornings", "Balanced schedule", "Late nights"]
+            QUESTIONS["rhythm"]
         )
 
         q5 = st.slider("Stability vs Adventure", 0, 10, 5)
@@ -76,9 +148,11 @@ if submitted:
         "rhythm": q4, "adventure": q5
     }
 
+# Results stay up while the weights below are tuned
+if st.session_state.answers:
     user_vec = build_user_vector(st.session_state.answers)
     
-    top_cities, top_scores = recommend_cities(user_vec, city_vectors_norm, top_n=3)
+    top_cities, top_scores = answer_table.recommend(st.session_state.answers, top_n=3)
     
     st.subheader(f"Top {len(top_cities)} Recommendations")
     
@@ -114,8 +188,12 @@ if submitted:
             """, unsafe_allow_html=True)
 
     st.divider()
+    weight_explorer(user_vec)
+
     # Optional: Debug expander to see why these cities were picked
     with st.expander("See algorithm details (Debug)"):
         st.write("User Vector:", user_vec)
         st.write("City Data (Normalized):")
-        st.dataframe(city_vectors_norm.loc[top_cities])
\ No newline at end of file
+        st.dataframe(city_vectors_norm.loc[top_cities])
+
+debug_panel()
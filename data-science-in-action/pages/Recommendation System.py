@@ -5,10 +5,24 @@ from PIL import Image
 import pydeck as pdk
 from components.background import add_bg
 
-from components.matching import find_matching
+from components.matching import rank_matching
+from components.range_index import RangeIndex
+from components.languages import LanguageIndex
+from components.geo_index import GeoIndex
+from components.ranking import PercentileRanker, SCORE_WEIGHTS
+from components.comparison import metric_matrix
+from components.pareto import ParetoEngine, OBJECTIVES, DEFAULT_OBJECTIVES
+from components.data import load_cities
+from components.profiling import timed, profiled
+from components.debug_panel import profile_page, debug_panel
+
+PAGE_SIZE = 9
+# Fronts shown in Pareto mode; cities past them are left out
+MAX_FRONTS = 5
 
 favicon = Image.open("data-science-in-action/images/house.png")
 st.set_page_config(page_title="City Recommendation", layout="wide", page_icon=favicon)
+profile_page("Recommendation System")
 
 st.markdown(
     """
@@ -23,159 +37,298 @@ st.markdown(
 )
 
 # --- Load data ---
+df = load_cities()
+
+@st.cache_resource
+def load_range_index():
+    return RangeIndex(load_cities())
+
+range_index = load_range_index()
+
+@st.cache_resource
+def load_language_index():
+    return LanguageIndex(load_cities())
+
+language_index = load_language_index()
+
+@st.cache_resource
+def load_ranker():
+    return PercentileRanker(load_cities())
+
+ranker = load_ranker()
+
+@st.cache_resource
+def load_geo_index():
+    return GeoIndex(load_cities())
+
+geo_index = load_geo_index()
+
+@st.cache_resource
+def load_pareto_engine():
+    return ParetoEngine(metric_matrix())
+
+# Slider bounds and defaults, computed once instead of on every rerun
 @st.cache_data
-def load_data():
-    return pd.read_csv("data/city_data_with_coordinates.csv")
+def sidebar_stats():
+    cities = load_cities()
+    stats = {
+        col: (cities[col].min(), cities[col].max(), cities[col].mean())
+        for col in ["Unemployment Rate", "GDP per Capita", "Average Rent Price", "Average Cost of Living"]
+    }
+    stats["languages"] = ["Any"] + load_language_index().options()
+    stats["cities"] = ["Anywhere"] + sorted(cities["City"].astype(str))
+    return stats
+
+stats = sidebar_stats()
 
-df = load_data()
+# Matches per (language, preferences, weights), shared by every rerun and session.
+# cache_resource hands back the same RankedMatches, so the ranking it has
+# already resolved is reused instead of being unpickled and sorted again.
+@st.cache_resource(max_entries=256)
+def matches(user_language, pref, weights, near=None):
+    return rank_matching(
+        load_cities(), user_language, pref, ranker=load_ranker(),
+        index=load_range_index(), languages=load_language_index(), weights=weights,
+        geo=load_geo_index(), near=near
+    )
+
+# Pareto fronts of the matches over the chosen objectives
+@st.cache_data(max_entries=256)
+def fronts(objectives, user_language, pref, weights, near=None):
+    results = matches(user_language, pref, weights, near)
+    return load_pareto_engine().fronts(list(objectives), results.positions, max_fronts=MAX_FRONTS)
 
 # --- Sidebar ---
+# A form: moving a slider changes nothing until the search is submitted
+with st.sidebar.form("preferences"):
+    lang_pref = st.selectbox(
+            'Prefered Main Spoken Language',
+            stats["languages"])
 
-languages_available = ["Any"] + list(df['Main Spoken Languages'].str.split(',').explode().str.strip().unique())
-lang_pref = st.sidebar.selectbox(
-        'Prefered Main Spoken Language',
-        languages_available)
-
-w_salary = st.sidebar.number_input(
-        "Min Monthly Salary (€)",
-        min_value=0,
-        max_value=20000,
-        value=3000,
-        step = 500)
-    
-w_unemployment = st.sidebar.slider("Unemployment Rate", min(df['Unemployment Rate']), max(df['Unemployment Rate']), np.mean(df['Unemployment Rate']))
-
-w_gdp = st.sidebar.slider(
-    "Max GDP per Capita (€)",
-    int(df["GDP per Capita"].min()),
-    int(df["GDP per Capita"].max()),
-    int(df["GDP per Capita"].mean()),
-    step=1000
-)
+    w_salary = st.number_input(
+            "Min Monthly Salary (€)",
+            min_value=0,
+            max_value=20000,
+            value=3000,
+            step = 500)
 
+    low, high, mean = stats["Unemployment Rate"]
+    w_unemployment = st.slider("Unemployment Rate", low, high, mean)
 
-w_rent = st.sidebar.slider(
-    "Max Rent Price",
-    min_value=int(df['Average Rent Price'].min()),
-    max_value=int(df['Average Rent Price'].max()),
-    value=int(df['Average Rent Price'].mean()),
-    step=50
-)
+    low, high, mean = stats["GDP per Capita"]
+    w_gdp = st.slider(
+        "Max GDP per Capita (€)",
+        int(low),
+        int(high),
+        int(mean),
+        step=1000
+    )
 
-w_cost = st.sidebar.slider(
-    "Max Cost of Living",
-    min_value=int(df['Average Cost of Living'].min()),
-    max_value=int(df['Average Cost of Living'].max()),
-    value=int(df['Average Cost of Living'].mean()),
-    step=50
-)
+    low, high, mean = stats["Average Rent Price"]
+    w_rent = st.slider(
+        "Max Rent Price",
+        min_value=int(low),
+        max_value=int(high),
+        value=int(mean),
+        step=50
+    )
+
+    low, high, mean = stats["Average Cost of Living"]
+    w_cost = st.slider(
+        "Max Cost of Living",
+        min_value=int(low),
+        max_value=int(high),
+        value=int(mean),
+        step=50
+    )
+
+    # Only cities within reach of where the user lives now
+    home = st.selectbox("Current home", stats["cities"])
+    max_distance = st.slider("Max distance from home (km)", 100, 3000, 1000, step=100)
 
-run_button = st.sidebar.button("Find Matching Cities", type="primary")
-results_placeholder = st.empty()
+    ranking = st.radio("Rank matches by", ["Score", "Pareto fronts"], horizontal=True)
+
+    with st.expander("Pareto objectives"):
+        # Cities no other match beats on all of these at once
+        objectives = st.multiselect(
+            "Objectives", list(OBJECTIVES), default=DEFAULT_OBJECTIVES, format_func=OBJECTIVES.get)
+
+    with st.expander("Score weights"):
+        # Importance of each ranking criterion; the sign (higher/lower is better) is fixed
+        score_weights = {
+            col: sign * st.slider(f"{col} weight", 0.0, 2.0, 1.0, step=0.1, key=f"weight_{col}")
+            for col, sign in SCORE_WEIGHTS.items()
+        }
+
+    run_button = st.form_submit_button("Find Matching Cities", type="primary")
 
 # --- Page ---
 if run_button:
-    preferences = {
-        "Unemployment Rate": w_unemployment,
-        "GDP per Capita": w_gdp,
-        "Average Monthly Salary": w_salary,
-        "Average Rent Price": w_rent,
-        "Average Cost of Living": w_cost
+    st.session_state.search = {
+        "user_language": lang_pref,
+        "pref": {
+            "Unemployment Rate": w_unemployment,
+            "GDP per Capita": w_gdp,
+            "Average Monthly Salary": w_salary,
+            "Average Rent Price": w_rent,
+            "Average Cost of Living": w_cost
+        },
+        "weights": score_weights,
+        "near": None,
     }
+    if home != "Anywhere":
+        home_row = df[df["City"] == home].iloc[0]
+        st.session_state.search["near"] = (float(home_row["Latitude"]), float(home_row["Longitude"]), max_distance)
+    st.session_state.objectives = tuple(objectives) if ranking == "Pareto fronts" and objectives else None
 
-    matching_cities = find_matching(df, user_language=lang_pref, pref=preferences)
+# --- Results ---
+# Fragments: paging through the cards reruns only the cards, not the map
+@st.fragment
+@profiled("results fragment")
+def show_results(search):
+    # Ranked lazily: only the top city and the visible page are materialized
+    results = matches(**search)
+    st.markdown(f"<h3 style='text-align:center'>We suggest you:", unsafe_allow_html=True)
 
-    if matching_cities.empty:
-        st.toast("No match found! Try changing your preferences", icon="😪")
-    else:
-        st.balloons()
-        st.markdown(f"<h3 style='text-align:center'>We suggest you:", unsafe_allow_html=True)
-
-         # --- Youtube Video ---
-        query = matching_cities['City'].iloc[0].replace(" ", "+") + "+city+tour"
-
-        st.markdown(
-            f"""
-            <div style='text-align:center; background-color:lightgreen; padding:10px; border-radius:10px;'>
-                <h1>{matching_cities['City'].iloc[0]}</h1>
-                <a href='https://www.youtube.com/results?search_query={query}' target='_blank' 
-                style='color:blue; text-decoration:underline; font-size:18px;'>
-                Watch a city tour on YouTube
-                </a>
-            </div>
-            """,
-            unsafe_allow_html=True
-            )
+    best_city = df['City'].iloc[results.top(1)[0][0]]
 
-        # --- Other Cities ---
-        st.divider()
-        other_cities = matching_cities  # or skip top city with .iloc[1:]
-        num_cols = 3
-        cols = st.columns(num_cols)
+     # --- Youtube Video ---
+    query = best_city.replace(" ", "+") + "+city+tour"
 
-        for i, (_, city) in enumerate(matching_cities.iterrows()):
-            with cols[i % num_cols]:
-                st.markdown(
-                    f"""
-                    <div style='
-                        background-color:#f0f2f6; 
-                        padding:20px; 
-                        border-radius:15px; 
-                        text-align:center; 
-                        box-shadow: 2px 2px 10px rgba(0,0,0,0.1); 
-                        margin-bottom:20px;
-                        position:relative;
-                    '>
-                        <div style='
-                            position:absolute; 
-                            top:10px; 
-                            right:10px; 
-                            background-color:#ffcc00; 
-                            border-radius:50%; 
-                            width:30px; 
-                            height:30px; 
-                            display:flex; 
-                            align-items:center; 
-                            justify-content:center; 
-                            font-weight:bold;
-                        '>{i+1}</div>
-                        <h3>{city['City']}</h3>
-                        <p>Salary: €{city['Average Monthly Salary']}</p>
-                        <p>Rent: €{city['Average Rent Price']}</p>
-                        <p>Cost of Living: €{city['Average Cost of Living']}</p>
-                        <p>Unemployment: {city['Unemployment Rate']}%</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-
-        # --- Location of the matching cities on the map ---
-        st.divider()
-        st.markdown(f"<h3 style='text-align:center'>Better to see them on the map:", unsafe_allow_html=True)
-
-        map_df = df[df['City'].isin(matching_cities['City'])]
-        map_df = map_df.rename(columns={"Latitude": "lat", "Longitude": "lon"})
-
-        layer = pdk.Layer(
-            "ScatterplotLayer",
-            data=map_df,
-            get_position='[lon, lat]',
-            get_radius=25000,
-            get_color=[255, 0, 0],
-            pickable=True
+    st.markdown(
+        f"""
+        <div style='text-align:center; background-color:lightgreen; padding:10px; border-radius:10px;'>
+            <h1>{best_city}</h1>
+            <a href='https://www.youtube.com/results?search_query={query}' target='_blank' 
+            style='color:blue; text-decoration:underline; font-size:18px;'>
+            Watch a city tour on YouTube
+            </a>
+        </div>
+        """,
+        unsafe_allow_html=True
         )
 
-        tooltip = {"text": "{City}"}
+    # --- Closest matches to home ---
+    if search.get("near"):
+        lat, lon, _ = search["near"]
+        nearest, km = geo_index.nearest(lat, lon, 3, positions=results.positions)
+        closest = ", ".join(f"{df['City'].iloc[p]} ({d:,.0f} km)" for p, d in zip(nearest, km))
+        st.markdown(f"<p style='text-align:center'>Closest to home: {closest}</p>", unsafe_allow_html=True)
 
-        view_state = pdk.ViewState(
-            longitude=map_df['lon'].mean(),
-            latitude=map_df['lat'].mean(),
-            zoom=3
-        )
+    # --- Other Cities ---
+    st.divider()
+    n_pages = -(-len(results) // PAGE_SIZE)
+    page = 0
+    if n_pages > 1:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) - 1
+    page_positions, _ = results.page(page, PAGE_SIZE)
+    distances = [None] * len(page_positions)
+    if search.get("near"):
+        lat, lon, _ = search["near"]
+        distances = geo_index.distances(lat, lon, page_positions)
+    num_cols = 3
+    cols = st.columns(num_cols)
+
+    for i, ((_, city), km) in enumerate(zip(df.take(page_positions).iterrows(), distances), start=page * PAGE_SIZE):
+        distance = "" if km is None else f"<p>Distance from home: {km:,.0f} km</p>"
+        with cols[i % num_cols]:
+            st.markdown(
+                f"""
+                <div style='
+                    background-color:#f0f2f6; 
+                    padding:20px; 
+                    border-radius:15px; 
+                    text-align:center; 
+                    box-shadow: 2px 2px 10px rgba(0,0,0,0.1); 
+                    margin-bottom:20px;
+                    position:relative;
+                '>
+                    <div style='
+                        position:absolute; 
+                        top:10px; 
+                        right:10px; 
+                        background-color:#ffcc00; 
+                        border-radius:50%; 
+                        width:30px; 
+                        height:30px; 
+                        display:flex; 
+                        align-items:center; 
+                        justify-content:center; 
+                        font-weight:bold;
+                    '>{i+1}</div>
+                    <h3>{city['City']}</h3>
+                    <p>Salary: €{city['Average Monthly Salary']}</p>
+                    <p>Rent: €{city['Average Rent Price']}</p>
+                    <p>Cost of Living: €{city['Average Cost of Living']}</p>
+                    <p>Unemployment: {city['Unemployment Rate']}%</p>
+                    {distance}
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
 
+@st.fragment
+@profiled("fronts fragment")
+def show_fronts(search, objectives):
+    positions, front = fronts(objectives, **search)
+    labels = [OBJECTIVES[col] for col in objectives]
+    table = metric_matrix().frame[list(objectives)].iloc[positions].set_axis(labels, axis=1)
+    table.insert(0, "Front", front + 1)
+    table = table.reset_index()
+
+    st.markdown(f"<h3 style='text-align:center'>No other match beats these on {', '.join(labels)}:", unsafe_allow_html=True)
+    st.dataframe(table[table["Front"] == 1].drop(columns="Front"), hide_index=True)
+
+    if len(labels) >= 2:
+        st.scatter_chart(table.astype({"Front": str}), x=labels[0], y=labels[1], color="Front")
+    if (table["Front"] > 1).any():
+        with st.expander(f"Next fronts (up to {MAX_FRONTS})"):
+            st.dataframe(table[table["Front"] > 1], hide_index=True)
+
+@st.fragment
+@profiled("map fragment")
+def show_map(search):
+    # --- Location of the matching cities on the map ---
+    results = matches(**search)
+    st.divider()
+    st.markdown(f"<h3 style='text-align:center'>Better to see them on the map:", unsafe_allow_html=True)
+
+    map_df = df[["City", "Latitude", "Longitude"]].take(results.positions)
+    map_df = map_df.rename(columns={"Latitude": "lat", "Longitude": "lon"})
+
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=map_df,
+        get_position='[lon, lat]',
+        get_radius=25000,
+        get_color=[255, 0, 0],
+        pickable=True
+    )
+
+    tooltip = {"text": "{City}"}
+
+    view_state = pdk.ViewState(
+        longitude=map_df['lon'].mean(),
+        latitude=map_df['lat'].mean(),
+        zoom=3
+    )
+
+    with timed("pydeck"):
         st.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip=tooltip))
-        st.divider()
+    st.divider()
 
+if "search" in st.session_state:
+    search = st.session_state.search
+    if len(matches(**search)) == 0:
+        if run_button:
+            st.toast("No match found! Try changing your preferences", icon="😪")
+    else:
+        if run_button:
+            st.balloons()
+        if st.session_state.get("objectives"):
+            show_fronts(search, st.session_state.objectives)
+        else:
+            show_results(search)
+        show_map(search)
 
-    
\ No newline at end of file
+debug_panel()
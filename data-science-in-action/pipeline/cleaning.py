@@ -0,0 +1,228 @@
+"""Batch pipeline that rebuilds the cleaned city datasets from data/city_data.csv.
+
+The notebook's cleaning cells are expressed as declarative stages. A stage's
+cache key hashes its code, its parameters and the content digests of its
+inputs (files or upstream outputs), and its output is stored under that key
+with a digest of its own. Changing one input file or one stage therefore
+re-runs only the stages downstream of it, and a stage whose output comes out
+unchanged stops the rerun there. The raw file is parsed in streaming chunks
+(see pipeline.ingest), with row digests carrying the deduplication across
+chunk boundaries.
+
+Run from the repository root with:
+
+    PYTHONPATH=data-science-in-action python -m pipeline.cleaning
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+
+import pandas as pd
+
+from components import data
+from components.flag import FLAGS_FILE, download_flags, flag_table
+from pipeline.ingest import CHUNKSIZE, CITY_FIXES, RENAMES, drop_duplicate_chunks, normalized_chunks
+
+CACHE_DIR = os.path.join(data.CACHE_DIR, "pipeline")
+
+# Bump to invalidate every cached stage (e.g. after changing a helper)
+PIPELINE_VERSION = 1
+
+# "Days since update" is counted up to this date, so reruns reproduce the
+# published files; pass --as-of today for a fresh count.
+AS_OF = "2025-12-19"
+
+DROP_COLUMNS = ['Average Price Groceries']
+
+# Missing values take the median (or mode) of the same country's cities
+COUNTRY_FILLS = {
+    'Unemployment Rate': 'median',
+    'GDP per Capita': 'median',
+    'Population Density': 'median',
+    'Main Spoken Languages': 'mode',
+}
+
+
+# --- Stage functions ---
+def parse(path, chunksize, renames, city_fixes, drop_columns):
+    chunks = normalized_chunks(path, chunksize, renames, city_fixes)
+    df = pd.concat(list(drop_duplicate_chunks(chunks)), ignore_index=True)
+    return df.drop(columns=drop_columns)
+
+
+def impute(df, country_fills):
+    df = df.copy()
+    missing_working_age = df['Working Age Population'].isna()
+    working_age_ratio = (df['Working Age Population'] / df['Population']).median()
+    df.loc[missing_working_age, 'Working Age Population'] = (df.loc[missing_working_age, 'Population'] * working_age_ratio).round()
+
+    by_country = df.groupby('Country', sort=False)
+    for col, how in country_fills.items():
+        if how == 'mode':
+            fill = by_country[col].transform(lambda x: x.mode()[0] if x.notna().any() else None)
+        else:
+            fill = by_country[col].transform(how)
+        df[col] = df[col].fillna(fill)
+    return df
+
+
+def derive(df, as_of):
+    df = df.copy()
+    today = pd.Timestamp(as_of).normalize()
+    df['Days since update'] = (today - df['Last Data Update']).dt.days
+    df['Affordability'] = df['Average Monthly Salary'] - df['Average Cost of Living']
+    return df
+
+
+def read_coordinates(path):
+    return pd.read_csv(path)
+
+
+def merge_coordinates(clean, coordinates):
+    return clean.merge(
+        coordinates[['City', 'Country', 'Latitude', 'Longitude', 'Wikipedia_URL']],
+        on=['City', 'Country'],
+        how='left'
+    )
+
+
+def country_flags(df):
+    # ISO code and flag URL per distinct country, so the pages never search pycountry
+    return flag_table(df['Country'])
+
+
+# --- Stages ---
+class Stage:
+    """One pipeline step: func(*upstream frames, **files, **params, **options).
+
+    Options tune how a stage runs without changing its output, so they are
+    left out of the cache key.
+    """
+
+    def __init__(self, name, func, inputs=(), files=None, params=None, options=None, output=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.files = dict(files or {})
+        self.params = dict(params or {})
+        self.options = dict(options or {})
+        self.output = output
+
+    def key(self, data_dir, upstream):
+        h = hashlib.sha1(f"v{PIPELINE_VERSION}:{self.name}".encode())
+        h.update(inspect.getsource(self.func).encode())
+        h.update(json.dumps(self.params, sort_keys=True, default=str).encode())
+        for arg, filename in sorted(self.files.items()):
+            h.update(f"{arg}={data.file_digest(os.path.join(data_dir, filename))}".encode())
+        for name in self.inputs:
+            h.update(upstream[name].encode())
+        return h.hexdigest()[:16]
+
+
+def stages(as_of=AS_OF, chunksize=CHUNKSIZE):
+    return [
+        Stage("parse", parse, files={"path": "city_data.csv"},
+              params={"renames": RENAMES, "city_fixes": CITY_FIXES, "drop_columns": DROP_COLUMNS},
+              options={"chunksize": chunksize}),
+        Stage("impute", impute, inputs=["parse"], params={"country_fills": COUNTRY_FILLS}),
+        Stage("derive", derive, inputs=["impute"], params={"as_of": as_of},
+              output="city_data_clean.csv"),
+        Stage("coordinates", read_coordinates, files={"path": "city_coordinates_scraped.csv"}),
+        Stage("merge", merge_coordinates, inputs=["derive", "coordinates"],
+              output="city_data_with_coordinates.csv"),
+        Stage("flags", country_flags, inputs=["merge"], output=FLAGS_FILE),
+    ]
+
+
+def frame_digest(df):
+    h = hashlib.sha1(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _dump_json(obj, path):
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=1)
+
+
+def run(pipeline=None, data_dir=data.DATA_DIR, cache_dir=CACHE_DIR, out_dir=None, log=print):
+    # Returns {stage name: (ran, output digest)} and writes each stage's output file
+    pipeline = stages() if pipeline is None else pipeline
+    out_dir = data_dir if out_dir is None else out_dir
+    os.makedirs(cache_dir, exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+
+    digests, frames, report = {}, {}, {}
+
+    def frame(name):
+        if name not in frames:
+            frames[name] = pd.read_parquet(os.path.join(cache_dir, manifest[keys[name]]["file"]))
+        return frames[name]
+
+    keys = {}
+    for stage in pipeline:
+        key = keys[stage.name] = stage.key(data_dir, digests)
+        cached = manifest.get(key)
+        ran = cached is None or not os.path.exists(os.path.join(cache_dir, cached["file"]))
+        if ran:
+            files = {arg: os.path.join(data_dir, f) for arg, f in stage.files.items()}
+            df = stage.func(*(frame(name) for name in stage.inputs), **files, **stage.params, **stage.options)
+            file = f"{stage.name}-{key}.parquet"
+            _write_atomic(os.path.join(cache_dir, file), lambda p: df.to_parquet(p, index=False))
+            cached = manifest[key] = {"stage": stage.name, "file": file, "digest": frame_digest(df)}
+            frames[stage.name] = df
+        digests[stage.name] = cached["digest"]
+        report[stage.name] = (ran, cached["digest"])
+        log(f"{stage.name:<12} {'ran' if ran else 'cached'}  {cached['digest']}")
+
+        if stage.output:
+            path = os.path.join(out_dir, stage.output)
+            if ran or not os.path.exists(path):
+                _write_atomic(path, lambda p: frame(stage.name).to_csv(p, index=False))
+
+    # Keep only the entries of the current run
+    live = set(keys.values())
+    for key, entry in list(manifest.items()):
+        if key not in live:
+            try:
+                os.remove(os.path.join(cache_dir, entry["file"]))
+            except FileNotFoundError:
+                pass
+            del manifest[key]
+    _write_atomic(manifest_path, lambda p: _dump_json(manifest, p))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the cleaned city datasets from data/city_data.csv")
+    parser.add_argument("--data-dir", default=data.DATA_DIR)
+    parser.add_argument("--out-dir", default=None, help="where to write the CSVs (default: the data dir)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--as-of", default=AS_OF, help="reference date for 'Days since update', or 'today'")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--download-flags", action="store_true", help="also cache the flag PNGs locally")
+    args = parser.parse_args()
+    as_of = pd.Timestamp.now().normalize().date().isoformat() if args.as_of == "today" else args.as_of
+    run(stages(as_of, args.chunksize), args.data_dir, args.cache_dir, args.out_dir)
+    if args.download_flags:
+        flags = pd.read_csv(os.path.join(args.out_dir or args.data_dir, FLAGS_FILE), keep_default_na=False)
+        fetched = download_flags(code for code in flags['ISO'] if code)
+        print(f"flags        {len(fetched)} downloaded")
+
+
+if __name__ == "__main__":
+    main()
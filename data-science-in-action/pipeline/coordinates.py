@@ -0,0 +1,177 @@
+"""Batch parsing and validation of city coordinates.
+
+Whole columns of decimal ("48.20833", "-3.7", "48.2°N") or DMS
+("48°12′30″N", "48° 12' 30\" N") strings are parsed by one regex that Arrow
+runs over the column, checked against the valid ranges and a Europe
+bounding box, and given a per-row Coordinate_Status instead of silently
+becoming None. Run from the repository root with e.g.
+
+    PYTHONPATH=data-science-in-action python -m pipeline.coordinates data/city_coordinates_scraped.csv
+
+to print a diagnostics summary (and --output to write the normalized file).
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+STATUS_COLUMN = "Coordinate_Status"
+
+# Per-row diagnostics, in the order they are checked
+OK = "ok"
+MISSING = "missing"              # no value
+UNPARSED = "unparsed"            # not a decimal or DMS coordinate
+BAD_MINUTES = "bad_minutes"      # minutes or seconds of 60 or more
+BAD_HEMISPHERE = "bad_hemisphere"  # E/W on a latitude, N/S on a longitude, or a sign and S/W
+OUT_OF_RANGE = "out_of_range"    # |lat| > 90 or |lon| > 180
+SWAPPED = "swapped"              # latitude and longitude exchanged; fixed
+OUTSIDE_BBOX = "outside_bbox"    # valid, but not in BBOX; kept
+
+# (min lat, max lat, min lon, max lon): Europe from the Canaries/Azores to the Urals' foot
+EUROPE_BBOX = (27.0, 72.0, -32.0, 45.0)
+
+LIMITS = {"lat": 90.0, "lon": 180.0}
+HEMISPHERES = {"lat": "NS", "lon": "EW", None: "NSEW"}
+
+_NUMBER = r"\d+(?:\.\d+)?"
+# A decimal or DMS coordinate (RE2 syntax, run by Arrow over a whole column)
+COORDINATE = (
+    r"^\s*(?P<sign>[-+−])?\s*"
+    rf"(?P<deg>{_NUMBER})\s*(?:°|º|deg\b)?\s*"
+    rf"(?:(?P<min>{_NUMBER})\s*[′'’]\s*)?"
+    rf"(?:(?P<sec>{_NUMBER})\s*(?:[″\"”]|′′|'')\s*)?"
+    r"(?P<hemi>[NSEWnsew])?\s*$"
+)
+# "48.2; 16.3", "48.2, 16.3" or "48°12′N 16°22′E"
+PAIR = r"^\s*(?P<lat>.*?[NSns]|[^;,]*?)\s*(?:[;,]\s*|\s+(?=.*[EWew]\s*$))(?P<lon>.+?)\s*$"
+
+
+def _group(parts, name):
+    # One regex group as an Arrow string array, "" where it did not match
+    return pc.fill_null(pc.struct_field(parts, name), "")
+
+
+def _floats(parts, name):
+    field = pc.struct_field(parts, name)
+    field = pc.if_else(pc.equal(field, ""), None, field)
+    return pc.cast(field, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def _numpy(array):
+    return array.to_numpy(zero_copy_only=False)
+
+
+def _text(values):
+    # Arrow string array of the str values (null elsewhere) and the str mask
+    try:
+        text = pa.array(values, type=pa.string(), from_pandas=True)
+        return text, _numpy(text.is_valid())
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        is_text = np.fromiter((type(v) is str for v in values), dtype=bool, count=len(values))
+        return pa.array(np.where(is_text, values, None), type=pa.string()), is_text
+
+
+def parse_coordinates(values, axis=None):
+    # (float64 array, status array) for one axis ("lat", "lon" or None);
+    # unparseable or invalid rows are NaN with the reason in status
+    values = np.asarray(pd.Series(values, dtype=object), dtype=object)
+    text, is_text = _text(values)
+    status = np.full(len(values), OK, dtype=object)
+
+    # Values that are already numbers (or missing)
+    numbers = pd.to_numeric(pd.Series(values[~is_text], dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+    not_text = np.flatnonzero(~is_text)
+    status[not_text[np.isnan(numbers)]] = MISSING
+    status[not_text[~pd.isna(values[~is_text]) & np.isnan(numbers)]] = UNPARSED
+
+    parts = pc.extract_regex(text, COORDINATE)
+    parsed = _numpy(parts.is_valid())
+    blank = is_text & _numpy(pc.fill_null(pc.equal(pc.utf8_trim_whitespace(text), ""), False))
+    minutes = _floats(parts, "min")
+    has_minutes = ~np.isnan(minutes)
+    minutes = np.nan_to_num(minutes)
+    seconds = np.nan_to_num(_floats(parts, "sec"))
+    hemi = pc.utf8_upper(_group(parts, "hemi"))
+    negative = _numpy(pc.is_in(_group(parts, "sign"), pa.array(["-", "−"])))
+    southwest = _numpy(pc.is_in(hemi, pa.array(["S", "W"])))
+    wrong_letter = _numpy(pc.and_(pc.not_equal(hemi, ""), pc.invert(pc.is_in(hemi, pa.array(list(HEMISPHERES[axis]))))))
+
+    value = _floats(parts, "deg") + minutes / 60 + seconds / 3600
+    value = np.where(negative | southwest, -value, value)
+    # Same rounding the scraper has always stored for DMS values
+    value = np.where(has_minutes, np.round(value, 6), value)
+    result = np.where(is_text, value, np.nan)
+    result[~is_text] = numbers
+
+    status[parsed & (wrong_letter | (negative & southwest))] = BAD_HEMISPHERE
+    status[parsed & ((minutes >= 60) | (seconds >= 60))] = BAD_MINUTES
+    status[is_text & ~parsed] = UNPARSED
+    status[blank] = MISSING
+
+    limit = LIMITS.get(axis, 180.0)
+    status[(status == OK) & (np.abs(result) > limit)] = OUT_OF_RANGE
+    result[status != OK] = np.nan
+    return result, status
+
+
+def split_pairs(values):
+    # "lat; lon" strings (as in span.geo) -> (lat strings, lon strings)
+    parts = pd.Series(values, dtype=object).astype("string").str.extract(PAIR)
+    return parts["lat"].to_numpy(dtype=object), parts["lon"].to_numpy(dtype=object)
+
+
+def in_bbox(lat, lon, bbox=EUROPE_BBOX):
+    lat_lo, lat_hi, lon_lo, lon_hi = bbox
+    return (lat >= lat_lo) & (lat <= lat_hi) & (lon >= lon_lo) & (lon <= lon_hi)
+
+
+def normalize(lat_values, lon_values, bbox=EUROPE_BBOX):
+    # (lat, lon, status) arrays. A pair is only kept when both axes parse; a
+    # pair that falls in bbox once swapped is swapped back, and valid pairs
+    # outside bbox are kept but flagged.
+    lat, lat_status = parse_coordinates(lat_values, "lat")
+    lon, lon_status = parse_coordinates(lon_values, "lon")
+    status = np.where(lat_status != OK, lat_status, lon_status).astype(object)
+    valid = status == OK
+    if bbox is not None:
+        inside = in_bbox(lat, lon, bbox)
+        swapped = valid & ~inside & in_bbox(lon, lat, bbox) & (np.abs(lon) <= 90)
+        lat, lon = np.where(swapped, lon, lat), np.where(swapped, lat, lon)
+        status[swapped] = SWAPPED
+        status[valid & ~inside & ~swapped] = OUTSIDE_BBOX
+    broken = ~np.isin(status, [OK, SWAPPED, OUTSIDE_BBOX])
+    lat[broken] = np.nan
+    lon[broken] = np.nan
+    return lat, lon, status
+
+
+def normalize_frame(df, lat="Latitude", lon="Longitude", bbox=EUROPE_BBOX):
+    # Copy of df with float coordinate columns and a STATUS_COLUMN
+    df = df.copy()
+    df[lat], df[lon], df[STATUS_COLUMN] = normalize(df[lat].to_numpy(), df[lon].to_numpy(), bbox)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse and validate the coordinate columns of a CSV")
+    parser.add_argument("path")
+    parser.add_argument("--output", default=None, help="write the normalized CSV here")
+    parser.add_argument("--no-bbox", action="store_true", help="skip the Europe bounding-box check")
+    args = parser.parse_args()
+
+    df = normalize_frame(pd.read_csv(args.path, dtype={"Latitude": object, "Longitude": object}),
+                         bbox=None if args.no_bbox else EUROPE_BBOX)
+    counts = df[STATUS_COLUMN].value_counts()
+    for status, n in counts.items():
+        print(f"{status:<16} {n}")
+    flagged = df.loc[df[STATUS_COLUMN] != OK]
+    if len(flagged):
+        print(flagged.drop(columns=[c for c in ("Wikipedia_URL",) if c in df.columns]).to_string(index=False))
+    if args.output:
+        df.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Streaming ingestion of raw, pipe-delimited city statistics.
+
+The raw feed is parsed in fixed-size chunks by a chain of generators: read,
+normalize City/Country, drop duplicates, write. Only one chunk is in memory at a
+time. Duplicates are found through 64-bit row digests held in a DigestSet (8
+bytes per distinct row), so a row repeated anywhere in the file is dropped.
+Each surviving chunk becomes one row group of a Parquet file with a fixed,
+dictionary-encoded schema. Run from the repository root with:
+
+    PYTHONPATH=data-science-in-action python -m pipeline.ingest data/city_data.csv data/.cache/city_data.parquet
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CHUNKSIZE = 50_000
+
+RENAMES = {
+    'Avgerage Rent Price': 'Average Rent Price',
+    'Working Age Population ': 'Working Age Population',
+    'Days of very strong heat stress': 'Days of Very Strong Heat Stress'
+}
+
+# Raw City values that are wrong beyond the separator clean-up
+CITY_FIXES = {"Greece, Athens": "Athens,Greece"}
+
+TEXT = pa.dictionary(pa.int32(), pa.string())
+
+# Output schema of a normalized chunk; nulls are allowed everywhere
+SCHEMA = pa.schema([
+    ("City", TEXT),
+    ("Country", TEXT),
+    ("Population Density", pa.float64()),
+    ("Population", pa.int64()),
+    ("Working Age Population", pa.float64()),
+    ("Youth Dependency Ratio", pa.float64()),
+    ("Unemployment Rate", pa.float64()),
+    ("GDP per Capita", pa.float64()),
+    ("Days of Very Strong Heat Stress", pa.int32()),
+    ("Main Spoken Languages", TEXT),
+    ("Average Monthly Salary", pa.int32()),
+    ("Average Rent Price", pa.int32()),
+    ("Average Cost of Living", pa.int32()),
+    ("Average Price Groceries", pa.float64()),
+    ("Last Data Update", pa.timestamp("ns")),
+])
+
+
+def read_raw_chunks(path, chunksize=CHUNKSIZE):
+    return pd.read_csv(path, sep='|', skiprows=1, chunksize=chunksize)
+
+
+def normalize_chunk(chunk, renames=RENAMES, city_fixes=CITY_FIXES):
+    chunk = chunk.rename(columns=renames)
+    chunk['City'] = chunk['City'].replace(city_fixes)
+    chunk['Main Spoken Languages'] = chunk['Main Spoken Languages'].str.replace(';', ',')
+    city = chunk['City'].str.replace('.', ',').str.replace(';', ',').str.split(',', expand=True)
+    city = city.reindex(columns=[0, 1])
+
+    # City and Country to the front, without spaces
+    rest = chunk.drop(columns=['City'])
+    chunk = pd.concat([
+        city[0].str.replace(' ', '').rename('City'),
+        city[1].str.replace(' ', '').rename('Country'),
+        rest,
+    ], axis=1)
+    chunk['Last Data Update'] = pd.to_datetime(chunk['Last Data Update'])
+    return chunk
+
+
+def normalized_chunks(path, chunksize=CHUNKSIZE, renames=RENAMES, city_fixes=CITY_FIXES):
+    for chunk in read_raw_chunks(path, chunksize):
+        yield normalize_chunk(chunk, renames, city_fixes)
+
+
+def row_digests(chunk):
+    # Numbers hash as float64 so a value reads the same in int and float chunks
+    numeric = chunk.select_dtypes("number").columns
+    return pd.util.hash_pandas_object(chunk.astype({c: "float64" for c in numeric}), index=False).to_numpy()
+
+
+class DigestSet:
+    """Set of uint64 digests kept as sorted numpy runs.
+
+    New digests become a run of their own; runs of similar size are merged,
+    so there are O(log n) runs to search and 8 bytes per member.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def __contains__(self, digest):
+        return bool(self._seen(np.array([digest], dtype=np.uint64))[0])
+
+    def _seen(self, digests):
+        seen = np.zeros(len(digests), dtype=bool)
+        for run in self.runs:
+            at = np.searchsorted(run, digests).clip(max=len(run) - 1)
+            seen |= run[at] == digests
+        return seen
+
+    def add_new(self, digests):
+        # Adds digests and returns a mask of the first occurrence of each new one
+        digests = np.asarray(digests, dtype=np.uint64)
+        unique, first = np.unique(digests, return_index=True)
+        new = ~self._seen(unique)
+        keep = np.zeros(len(digests), dtype=bool)
+        keep[first[new]] = True
+        if new.any():
+            self.runs.append(unique[new])
+            while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+                merged = np.concatenate(self.runs[-2:])
+                merged.sort()
+                self.runs[-2:] = [merged]
+        return keep
+
+
+def drop_duplicate_chunks(chunks, seen=None):
+    # Keeps the first occurrence of every row across all chunks
+    seen = DigestSet() if seen is None else seen
+    for chunk in chunks:
+        yield chunk[seen.add_new(row_digests(chunk))]
+
+
+def ingest(path, out_path, chunksize=CHUNKSIZE, compression="zstd"):
+    # Writes the deduplicated, normalized rows to out_path; returns row counts
+    stats = {"chunks": 0, "rows_in": 0, "rows_out": 0}
+
+    def counted(chunks):
+        for chunk in chunks:
+            stats["chunks"] += 1
+            stats["rows_in"] += len(chunk)
+            yield chunk
+
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with pq.ParquetWriter(tmp, SCHEMA, compression=compression) as writer:
+        for chunk in drop_duplicate_chunks(counted(normalized_chunks(path, chunksize))):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=SCHEMA, preserve_index=False))
+            stats["rows_out"] += len(chunk)
+    os.replace(tmp, out_path)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a raw city statistics file into deduplicated Parquet")
+    parser.add_argument("path")
+    parser.add_argument("out_path")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.out_path) or ".", exist_ok=True)
+
+    start = time.perf_counter()
+    stats = ingest(args.path, args.out_path, args.chunksize)
+    print(f"{stats['rows_in']} rows in {stats['chunks']} chunks -> {stats['rows_out']} unique rows "
+          f"in {args.out_path} ({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
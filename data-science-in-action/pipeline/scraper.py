@@ -0,0 +1,264 @@
+"""Concurrent, resumable scraper for city coordinates on Wikipedia.
+
+Every city page is fetched once on a pooled session, a few at a time, with
+a per-host rate limit. Each finished city is appended to a JSON-lines
+checkpoint, so an interrupted run picks up where it stopped; with --refresh
+the checkpointed pages are revalidated with ETag/Last-Modified and a 304
+keeps the stored coordinates. Run from the repository root with:
+
+    PYTHONPATH=data-science-in-action python -m pipeline.scraper
+
+--base-url points the fetches at another server (e.g. a local fixture)
+while the Wikipedia_URL column keeps the canonical links.
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pipeline.coordinates import OK, STATUS_COLUMN, normalize_frame, parse_coordinates, split_pairs
+
+WIKIPEDIA_BASE = "https://en.wikipedia.org"
+CITIES_PATH = os.path.join("data", "city_data_clean.csv")
+OUTPUT_PATH = os.path.join("data", "city_coordinates_scraped.csv")
+CHECKPOINT_PATH = os.path.join("data", ".cache", "coordinates_checkpoint.jsonl")
+USER_AGENT = "University research project"
+
+COLUMNS = ["City", "Country", "Latitude", "Longitude", "Wikipedia_URL", "Scrape_Success"]
+
+MANUAL_URLS = {
+    "FrankfurtamMain": "https://en.wikipedia.org/wiki/Frankfurt",
+    "Gent": "https://en.wikipedia.org/wiki/Ghent",
+    "helsinky tempere": "https://en.wikipedia.org/wiki/Tampere",
+    "TheHague": "https://en.wikipedia.org/wiki/The_Hague",
+    "Split": "https://en.wikipedia.org/wiki/Split,_Croatia",
+    "Cork": "https://en.wikipedia.org/wiki/Cork_(city)"
+}
+
+
+def construct_wikipedia_url(city):
+    if city in MANUAL_URLS:
+        return MANUAL_URLS[city]
+    return f"{WIKIPEDIA_BASE}/wiki/{city}"
+
+
+def dms_to_decimal(dms, axis=None):
+    # One DMS or decimal string; None when it does not parse (see pipeline.coordinates)
+    value, status = parse_coordinates([dms], axis)
+    return float(value[0]) if status[0] == OK else None
+
+
+# --- Coordinate extraction ---
+# A page only needs its first span.geo (or span.latitude/longitude), so a
+# targeted regex over the raw HTML replaces building a full soup tree.
+def _span(css_class):
+    return re.compile(
+        r'<span\b[^>]*\bclass="(?:[^"]*\s)?' + css_class + r'(?:\s[^"]*)?"[^>]*>([^<]*)</span>'
+    )
+
+GEO = _span("geo")
+LATITUDE = _span("latitude")
+LONGITUDE = _span("longitude")
+
+
+def _pair(lat_text, lon_text):
+    lat, lon = dms_to_decimal(lat_text, "lat"), dms_to_decimal(lon_text, "lon")
+    return None if lat is None or lon is None else (lat, lon)
+
+
+def extract_coordinates(html):
+    geo = GEO.search(html)
+    if geo:
+        lat, lon = split_pairs([geo.group(1)])
+        coordinates = _pair(lat[0], lon[0])
+        if coordinates is not None:
+            return coordinates
+
+    lat_span = LATITUDE.search(html)
+    lon_span = LONGITUDE.search(html)
+    if lat_span and lon_span:
+        return _pair(lat_span.group(1), lon_span.group(1))
+
+    return None
+
+
+# --- HTTP ---
+class RateLimiter:
+    """Spaces requests to each host at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def make_session(pool_size, retries=3):
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_url(url, base_url=None):
+    # The canonical URL is what gets stored; base_url only redirects the fetch
+    if base_url:
+        return base_url.rstrip("/") + url[len(WIKIPEDIA_BASE):]
+    return url
+
+
+def scrape_city_coordinates(city, country, session, limiter, base_url=None, previous=None, timeout=10):
+    url = construct_wikipedia_url(city)
+    result = {
+        "City": city,
+        "Country": country,
+        "Latitude": None,
+        "Longitude": None,
+        "Wikipedia_URL": url,
+        "Scrape_Success": False
+    }
+
+    headers = {}
+    if previous and previous["Scrape_Success"]:
+        if previous.get("ETag"):
+            headers["If-None-Match"] = previous["ETag"]
+        if previous.get("Last-Modified"):
+            headers["If-Modified-Since"] = previous["Last-Modified"]
+
+    try:
+        target = fetch_url(url, base_url)
+        limiter.wait(urlsplit(target).netloc)
+        r = session.get(target, headers=headers, timeout=timeout)
+        if r.status_code == 304:
+            return {**previous, "Not_Modified": True}
+        r.raise_for_status()
+
+        coordinates = extract_coordinates(r.text)
+        if coordinates is not None:
+            result["Latitude"], result["Longitude"] = coordinates
+            result["Scrape_Success"] = True
+        result["ETag"] = r.headers.get("ETag")
+        result["Last-Modified"] = r.headers.get("Last-Modified")
+
+    except Exception as e:
+        result["Error"] = str(e)
+
+    return result
+
+
+# --- Checkpoint ---
+def load_checkpoint(path):
+    # Latest record per (City, Country); a torn last line is ignored
+    done = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                done[(record["City"], record["Country"])] = record
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def scrape_all(cities, checkpoint_path=CHECKPOINT_PATH, workers=8, rate=10.0, base_url=None,
+               refresh=False, progress=None):
+    # cities: DataFrame with City and Country. Returns one row per city, in input order.
+    pairs = list(cities[["City", "Country"]].itertuples(index=False, name=None))
+    done = load_checkpoint(checkpoint_path)
+    # A city is settled when a successful record for its current URL exists
+    settled = {
+        key: record for key, record in done.items()
+        if record["Scrape_Success"] and record["Wikipedia_URL"] == construct_wikipedia_url(key[0])
+    }
+    todo = pairs if refresh else [key for key in pairs if key not in settled]
+
+    results = dict(settled)
+    if todo:
+        os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+        session = make_session(workers)
+        limiter = RateLimiter(rate)
+        lock = threading.Lock()
+        with open(checkpoint_path, "a") as checkpoint, ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(scrape_city_coordinates, city, country, session, limiter,
+                            base_url, settled.get((city, country))): (city, country)
+                for city, country in todo
+            }
+            for n, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                results[futures[future]] = record
+                with lock:
+                    checkpoint.write(json.dumps(record) + "\n")
+                    checkpoint.flush()
+                if progress is not None:
+                    progress(n, len(todo), record)
+
+    return pd.DataFrame([results[key] for key in pairs], columns=COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape city coordinates from Wikipedia")
+    parser.add_argument("--cities", default=CITIES_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=10.0, help="requests per second per host")
+    parser.add_argument("--base-url", default=None, help="fetch pages from this server instead of Wikipedia")
+    parser.add_argument("--refresh", action="store_true", help="revalidate checkpointed pages")
+    args = parser.parse_args()
+
+    def progress(n, total, record):
+        status = "OK" if record["Scrape_Success"] else "FAILED"
+        if record.get("Not_Modified"):
+            status = "NOT MODIFIED"
+        print(f"[{n}/{total}] {record['City']}, {record['Country']} → {status}")
+
+    start_time = time.time()
+    coordinates_df = scrape_all(
+        pd.read_csv(args.cities), args.checkpoint, args.workers, args.rate,
+        args.base_url, args.refresh, progress,
+    )
+    # Range and bounding-box checks on the whole column, with a status per city
+    coordinates_df = normalize_frame(coordinates_df)
+    coordinates_df.to_csv(args.output, index=False)
+
+    success_count = coordinates_df["Scrape_Success"].sum()
+    print(f"Time: {time.time() - start_time:.1f} s | Success: {success_count}/{len(coordinates_df)}")
+    failed = coordinates_df.loc[~coordinates_df["Scrape_Success"], ["City", "Country"]]
+    if len(failed):
+        print("Failed cities:")
+        print(failed)
+    flagged = coordinates_df.loc[coordinates_df["Scrape_Success"] & (coordinates_df[STATUS_COLUMN] != OK)]
+    if len(flagged):
+        print("Coordinates to check:")
+        print(flagged[["City", "Country", "Latitude", "Longitude", STATUS_COLUMN]])
+    print(f"Coordinates saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Headless JSON API for the matching and recommendation engines.
+
+A plain ASGI application; serve it from the repository root with e.g.
+
+    PYTHONPATH=data-science-in-action uvicorn service.app:app --workers 4
+
+Each worker loads the data, indexes and answer table once at startup and
+answers from memory. Request bodies use the same dicts the pages build:
+
+    GET  /health
+    POST /match            {"user_language": "Any", "pref": {...}, "weights": {...}, "limit": 10,
+                            "near": [latitude, longitude, radius_km]}
+    POST /match/batch      {"requests": [<match body>, ...]}
+    POST /recommend        {"answers": {"weekend": ..., "adventure": 5}, "top_n": 3}
+    POST /recommend/batch  {"requests": [<recommend body>, ...]}
+"""
+import asyncio
+import json
+import math
+
+from components import data
+from components.answer_table import cached_table
+from components.column_store import dataset_version, open_store
+from components.geo_index import GeoIndex
+from components.languages import LanguageIndex
+from components.matching import rank_matching
+from components.preferences import build_city_matrix, build_user_vector, normalize
+from components.range_index import RangeIndex
+from components.ranking import PercentileRanker
+from components.similarity import cached_index
+
+MATCH_COLUMNS = [
+    "City", "Country", "Average Monthly Salary", "Average Rent Price",
+    "Average Cost of Living", "Unemployment Rate", "GDP per Capita",
+]
+DEFAULT_LIMIT = 10
+MAX_BATCH = 10_000
+MAX_BODY = 10 * 2**20
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Engine:
+    """Everything the endpoints read, loaded once per process."""
+
+    def __init__(self, data_dir=data.DATA_DIR):
+        self.version = dataset_version(data_dir)
+        self.cities = data.load_cities(data_dir=data_dir)
+        self.index = RangeIndex(self.cities)
+        self.languages = LanguageIndex(self.cities)
+        self.ranker = PercentileRanker(self.cities)
+        self.geo = GeoIndex(self.cities)
+        # Response columns as plain arrays: row selection without pandas overhead
+        self.columns = {
+            col: self.cities[col].to_numpy(dtype=object if col in ("City", "Country") else None)
+            for col in MATCH_COLUMNS
+        }
+
+        store = open_store(version=self.version)
+        if store is not None:
+            matrix = store.matrix("lifestyle")
+        else:
+            merged = data.load_merged(data_dir)
+            matrix = normalize(build_city_matrix(merged, languages=LanguageIndex(merged)))
+        self.scorer = cached_index(matrix)
+        self.answers = cached_table(matrix, scorer=self.scorer)
+
+    def health(self, body):
+        return {"status": "ok", "version": self.version, "cities": len(self.cities)}
+
+    def match(self, body):
+        results = rank_matching(
+            self.cities, _field(body, "user_language", "Any"), _field(body, "pref"), self.ranker,
+            index=self.index, languages=self.languages, weights=_weights(body, self.ranker.weights),
+            geo=self.geo, near=_near(body),
+        )
+        limit = _field(body, "limit", DEFAULT_LIMIT)
+        if limit is not None and int(limit) < 0:
+            raise BadRequest("'limit' must be at least 0")
+        positions, scores = results.top(len(results) if limit is None else int(limit))
+        values = [self.columns[col][positions].tolist() for col in MATCH_COLUMNS]
+        cities = [dict(zip(MATCH_COLUMNS, row), score=score) for *row, score in zip(*values, scores.tolist())]
+        return {"total": len(results), "cities": cities}
+
+    def recommend(self, body):
+        answers = _field(body, "answers")
+        top_n = int(_field(body, "top_n", 3))
+        if top_n < 1:
+            raise BadRequest("'top_n' must be at least 1")
+        try:
+            if top_n <= self.answers.k:
+                cities, scores = self.answers.recommend(answers, top_n)
+            else:
+                cities, scores = self.scorer.recommend(build_user_vector(answers), top_n)
+        except KeyError as e:
+            raise BadRequest(f"Unknown or missing answer {e}")
+        return {"cities": [str(c) for c in cities], "scores": scores}
+
+    def batch(self, handler):
+        def run(body):
+            requests = _field(body, "requests")
+            if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+                raise BadRequest(f"'requests' must be a list of at most {MAX_BATCH} bodies")
+            results = []
+            for i, request in enumerate(requests):
+                try:
+                    results.append(handler(request))
+                except BadRequest as e:
+                    raise BadRequest(f"requests[{i}]: {e}")
+            return {"results": results}
+        return run
+
+
+def _field(body, name, default=...):
+    if not isinstance(body, dict):
+        raise BadRequest("Request body must be a JSON object")
+    if name not in body:
+        if default is ...:
+            raise BadRequest(f"Missing field '{name}'")
+        return default
+    return body[name]
+
+
+def _near(body):
+    near = body.get("near")
+    if near is None:
+        return None
+    if not isinstance(near, list) or len(near) != 3:
+        raise BadRequest("'near' must be [latitude, longitude, radius_km]")
+    return tuple(float(x) for x in near)
+
+
+def _weights(body, known):
+    weights = body.get("weights")
+    if weights is None:
+        return None
+    if not isinstance(weights, dict) or not all(
+        col in known and isinstance(w, (int, float)) and not isinstance(w, bool) for col, w in weights.items()
+    ):
+        raise BadRequest(f"'weights' must map columns of {sorted(known)} to numbers")
+    return weights
+
+
+_engine = None
+
+
+def engine():
+    global _engine
+    if _engine is None:
+        _engine = Engine()
+    return _engine
+
+
+def routes(e):
+    return {
+        ("GET", "/health"): e.health,
+        ("POST", "/match"): e.match,
+        ("POST", "/match/batch"): e.batch(e.match),
+        ("POST", "/recommend"): e.recommend,
+        ("POST", "/recommend/batch"): e.batch(e.recommend),
+    }
+
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        size += len(chunks[-1])
+        if size > MAX_BODY:
+            raise BadRequest(f"Body larger than {MAX_BODY} bytes")
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _json_safe(value):
+    # NaN/inf (a missing metric or score) -> null: strict JSON has no NaN
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+async def _respond(send, status, payload):
+    try:
+        body = json.dumps(payload, allow_nan=False).encode()
+    except ValueError:
+        body = json.dumps(_json_safe(payload), allow_nan=False).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+_routes = None
+
+
+async def app(scope, receive, send):
+    global _routes
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    _routes = routes(engine())
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    if _routes is None:
+        _routes = routes(engine())
+    handler = _routes.get((scope["method"], scope["path"]))
+    if handler is None:
+        known = any(path == scope["path"] for _, path in _routes)
+        await _respond(send, 405 if known else 404, {"error": "Method not allowed" if known else "Not found"})
+        return
+
+    try:
+        body = await _read_body(receive)
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            raise BadRequest("Body is not valid JSON")
+        # CPU-bound: run in the default thread pool so a large batch does
+        # not block the event loop for every other client
+        result = await asyncio.get_running_loop().run_in_executor(None, handler, payload)
+    except BadRequest as e:
+        await _respond(send, 400, {"error": str(e)})
+        return
+    except (KeyError, TypeError, ValueError) as e:
+        await _respond(send, 400, {"error": f"Invalid request: {e!r}"})
+        return
+    await _respond(send, 200, result)